@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+try:
+    import argparse
+    import csv
+    import json
+    from multiprocessing import Pool
+    import os
+    import pathlib
+    import sys
+    from time import perf_counter
+
+    from logger import logger
+    from predict import draw_result, get_predictor, load_image, output_folder, samples_folder
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Scores the photos of a folder without the browser or the network, for example the photos saved in 'matched_photos'. The photos are
+# analyzed in parallel by a pool of processes and each process loads the models only once.
+
+IMAGE_EXTENSIONS = ('.bmp', '.jpeg', '.jpg', '.png', '.webp')
+CSV_FIELDS = ['path', 'faces', 'scores', 'boxes', 'seconds', 'error']
+
+# Set in each process of the pool when it starts.
+worker_settings = {'draw_folder': None, 'input_folder': None}
+
+
+def find_images(input_folder):
+    for root, _, files in os.walk(input_folder):
+        for file in sorted(files):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, file)
+
+
+# Every process runs its own copy of the models, so each one is limited to a few threads to avoid fighting for the cores.
+def initialize_worker(threads_per_worker, draw_folder, input_folder):
+    global worker_settings
+
+    import predict
+
+    predict.predictor = predict.BeautyPredictor(threads=threads_per_worker)
+    worker_settings = {'draw_folder': draw_folder, 'input_folder': input_folder}
+
+
+def score_image(image_path):
+    start = perf_counter()
+    result = {'path': image_path, 'faces': 0, 'scores': [], 'boxes': [], 'seconds': 0}
+
+    image_matrix = load_image(image_path)
+    if image_matrix is None:
+        result['error'] = 'Invalid path or format.'
+    else:
+        predictor = get_predictor()
+        detection = predictor.detect_faces(image_matrix)
+        if len(detection.boxes) > 0:
+            punctuations = predictor.batch_beauty_predict([detection])[0]
+            result['faces'] = len(detection.boxes)
+            result['scores'] = [round(float(punctuation), 4) for punctuation in punctuations]
+            result['boxes'] = [list(box) for box in detection.boxes]
+
+            if worker_settings['draw_folder'] is not None:
+                for values, punctuation in zip(detection.boxes, punctuations):
+                    draw_result(values, detection.image, punctuation)
+                save_annotated_image(image_path, detection.image)
+
+    result['seconds'] = round(perf_counter() - start, 4)
+
+    return result
+
+
+def save_annotated_image(image_path, image_matrix):
+    import cv2
+
+    relative_path = os.path.relpath(image_path, worker_settings['input_folder'])
+    annotated_path = os.path.join(worker_settings['draw_folder'], relative_path)
+    pathlib.Path(os.path.dirname(annotated_path)).mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(annotated_path, image_matrix)
+
+
+# The results are written as soon as each photo is scored, so a long execution can be stopped without losing the work already done.
+class ResultWriter:
+
+    def __init__(self, path, output_format):
+        self.output_format = output_format
+        self.file = open(path, encoding='utf-8', mode='w', newline='')
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    def write(self, result):
+        if self.output_format == 'csv':
+            row = dict(result)
+            row['scores'] = ' '.join(str(punctuation) for punctuation in result['scores'])
+            row['boxes'] = ' '.join(','.join(str(value) for value in box) for box in result['boxes'])
+            self.csv_writer.writerow(row)
+        else:
+            self.file.write(json.dumps(result) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Detects the faces and predicts the beauty of the photos of a folder.')
+    parser.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser.add_argument('--output', default='predictions.jsonl', help='File where the results are written.')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help='Format of the results. By default, taken from the file.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of processes. By default, one per core.')
+    parser.add_argument('--threads-per-worker', type=int, default=1, help='Number of threads of the beauty model in each process.')
+    parser.add_argument('--draw', action='store_true', help='Save a copy of each photo with the detected faces and their scores.')
+    parser.add_argument('--draw-folder', default=output_folder, help='Folder where the copies of the photos are saved.')
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    output_format = arguments.format
+    if output_format is None:
+        output_format = 'csv' if arguments.output.lower().endswith('.csv') else 'jsonl'
+    draw_folder = arguments.draw_folder if arguments.draw else None
+
+    image_paths = list(find_images(arguments.input))
+    if len(image_paths) == 0:
+        logger.warning('No photos found in folder: {}.'.format(arguments.input))
+        return
+
+    logger.info('Scoring {} photo(s) with {} process(es).'.format(len(image_paths), arguments.workers))
+    writer = ResultWriter(arguments.output, output_format)
+    faces = 0
+    failed_photos = 0
+    start = perf_counter()
+    try:
+        with Pool(arguments.workers, initializer=initialize_worker,
+                  initargs=(arguments.threads_per_worker, draw_folder, arguments.input)) as pool:
+            for index, result in enumerate(pool.imap_unordered(score_image, image_paths), start=1):
+                writer.write(result)
+                faces += result['faces']
+                if 'error' in result:
+                    failed_photos += 1
+                    logger.warning('[{}/{}] {}: {}'.format(index, len(image_paths), result['path'], result['error']))
+                else:
+                    logger.info('[{}/{}] {}: {} face(s) in {:.2f} s.'.format(index, len(image_paths), result['path'], result['faces'],
+                                                                              result['seconds']))
+    finally:
+        writer.close()
+    elapsed_time = perf_counter() - start
+
+    logger.info('Scored {} photo(s) and {} face(s) in {:.2f} s: {:.2f} photos/s, {:.2f} faces/s.'.format(
+        len(image_paths), faces, elapsed_time, len(image_paths) / elapsed_time, faces / elapsed_time))
+    if failed_photos > 0:
+        logger.warning('{} photo(s) could not be scored, see the error of their results.'.format(failed_photos))
+
+
+if __name__ == "__main__":  # Execute only if run as a script
+    main()
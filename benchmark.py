@@ -0,0 +1,604 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+try:
+    import argparse
+    from datetime import datetime
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    import json
+    from multiprocessing import get_context
+    import os
+    import platform
+    import sys
+    import threading
+    from time import perf_counter
+
+    from batch_predict import find_images
+    from http_client import get_face_check_url, HttpClient
+    from inference_backends import BACKENDS, get_backend_model_path
+    from logger import logger
+    from model_registry import get_memory_usage_mb
+    from predict import (BeautyPredictor, decode_image, FaceDetection, get_predictor, reduce_for_detection, resize_for_detection,
+                         samples_folder, scale_boxes)
+    from resources.constants import DETECTION_SIZE, FACE_CHECK_SIZE_MAPPING, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, MAX_PHOTO_SIZE
+    from timing import summarize
+    import numpy as np
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Measures the prediction pipeline offline with local photos, so the effect of a change in the performance can be known before using it.
+# The results are saved in a JSON file that can be compared later with the results of another execution.
+
+STAGES = ['decode', 'resize', 'detect', 'crop_normalize', 'predict', 'score_mapping']
+PERCENTILES = [50, 90, 95, 99]
+
+
+def load_fixtures(input_folder, generate):
+    import cv2
+
+    fixtures = []
+    if input_folder is not None and os.path.isdir(input_folder):
+        for image_path in find_images(input_folder):
+            with open(image_path, 'rb') as image_file:
+                fixtures.append((os.path.basename(image_path), image_file.read()))
+
+    # Generated photos are always the same thanks to the seed, they are useful when there are no local photos. They do not have faces, so
+    # in that case the model is measured with generated faces.
+    random_generator = np.random.RandomState(0)
+    for index in range(generate):
+        image_matrix = random_generator.randint(0, 256, size=(800, 640, 3), dtype=np.uint8)
+        _, encoded_image = cv2.imencode('.jpg', image_matrix)
+        fixtures.append(('generated_{}.jpg'.format(index), encoded_image.tobytes()))
+
+    return fixtures
+
+
+class StageTimes:
+
+    def __init__(self):
+        self.times = {stage: [] for stage in STAGES}
+
+    def measure(self, stage, function, *args):
+        start = perf_counter()
+        result = function(*args)
+        self.times[stage].append(perf_counter() - start)
+
+        return result
+
+
+# The same steps as BeautyPredictor.detect_faces, so the time spent resizing the photo is measured apart from the detector. The photos
+# without faces in the reduced image are measured twice in both stages.
+def measure_detection(image_matrix, stage_times, predictor):
+    reduced_image, scale = stage_times.measure('resize', reduce_for_detection, image_matrix)
+    boxes = stage_times.measure('detect', predictor.find_faces, reduced_image)
+    if len(boxes) == 0:
+        resized_image, resized_scale = stage_times.measure('resize', resize_for_detection, image_matrix)
+        if resized_image.shape != reduced_image.shape:
+            scale = resized_scale
+            boxes = stage_times.measure('detect', predictor.find_faces, resized_image)
+
+    return FaceDetection(image_matrix, scale, scale_boxes(boxes, scale))
+
+
+def measure_pipeline(fixtures, stage_times, predictor):
+    faces = 0
+    for _, image_data in fixtures:
+        image_matrix = stage_times.measure('decode', decode_image, image_data)
+        if image_matrix is None:
+            continue
+        detection = measure_detection(image_matrix, stage_times, predictor)
+        if len(detection.boxes) > 0:
+            normed_images, face_owners = stage_times.measure('crop_normalize', predictor.prepare_faces, [detection])
+            if len(face_owners) > 0:
+                predictions = stage_times.measure('predict', predictor.run_model, normed_images)
+                stage_times.measure('score_mapping', predictor.map_scores, predictions, face_owners, 1)
+                faces += len(face_owners)
+
+    return faces
+
+
+def measure_generated_faces(number_of_faces, stage_times, predictor):
+    random_generator = np.random.RandomState(0)
+    for _ in range(number_of_faces):
+        normed_images = random_generator.uniform(-1, 1, size=(1, 224, 224, 3)).astype(np.float32)
+        predictions = stage_times.measure('predict', predictor.run_model, normed_images)
+        stage_times.measure('score_mapping', predictor.map_scores, predictions, [0], 1)
+
+    return number_of_faces
+
+
+def run_benchmark(arguments):
+    fixtures = load_fixtures(arguments.input, arguments.generate)
+    if len(fixtures) == 0:
+        logger.error('There are no photos to measure. Use --input with a folder of photos or --generate.')
+        return 1
+
+    predictor = get_predictor()
+    # The first round loads the models and prepares them, it is not representative of the steady state so it is not measured.
+    measure_pipeline(fixtures[:1], StageTimes(), predictor)
+    predictor.run_model(np.zeros((1, 224, 224, 3), dtype=np.float32))
+
+    stage_times = StageTimes()
+    faces = 0
+    generated_faces = False
+    start = perf_counter()
+    for _ in range(arguments.repeat):
+        faces += measure_pipeline(fixtures, stage_times, predictor)
+    if faces == 0:
+        generated_faces = True
+        for _ in range(arguments.repeat):
+            faces += measure_generated_faces(len(fixtures), stage_times, predictor)
+    elapsed_time = perf_counter() - start
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'platform': {'machine': platform.machine(), 'python': platform.python_version(), 'system': platform.system()},
+        'images': len(fixtures) * arguments.repeat,
+        'faces': faces,
+        'generated_faces': generated_faces,
+        'stages': {stage: summarize(values, PERCENTILES) for stage, values in stage_times.times.items()},
+        'throughput': {'images_per_second': len(fixtures) * arguments.repeat / elapsed_time, 'faces_per_second': faces / elapsed_time},
+        'memory_mb': get_memory_usage_mb()
+    }
+
+    print_results(results)
+    with open(arguments.output, encoding='utf-8', mode='w') as output_file:
+        json.dump(results, output_file, indent=2)
+    logger.info('Benchmark results saved in: {}.'.format(arguments.output))
+
+    if arguments.baseline is not None:
+        return compare_results(load_results(arguments.baseline), results, arguments.budget)
+
+    return 0
+
+
+def print_results(results):
+    print('{:<16}{:>8}{:>12}{:>12}{:>12}{:>12}'.format('Stage', 'Count', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)'))
+    for stage, summary in results['stages'].items():
+        if summary['count'] > 0:
+            print('{:<16}{:>8}{:>12.2f}{:>12.2f}{:>12.2f}{:>12.2f}'.format(stage, summary['count'], summary['mean'] * 1000,
+                                                                          summary['p50'] * 1000, summary['p95'] * 1000,
+                                                                          summary['p99'] * 1000))
+    print('Throughput: {:.2f} images/s, {:.2f} faces/s{}.'.format(results['throughput']['images_per_second'],
+                                                                 results['throughput']['faces_per_second'],
+                                                                 ' (generated faces)' if results['generated_faces'] else ''))
+    if results['memory_mb'] is not None:
+        print('Memory: {:.1f} MB.'.format(results['memory_mb']))
+
+
+def load_results(path):
+    with open(path, encoding='utf-8', mode='r') as results_file:
+        return json.load(results_file)
+
+
+# A regression is a stage whose median or 95th percentile is slower than the baseline by more than the budget, a lower throughput or a
+# higher memory usage by more than the budget.
+def compare_results(baseline, current, budget):
+    regressions = []
+    limit = 1 + budget / 100
+
+    for stage in STAGES:
+        baseline_stage = baseline['stages'].get(stage, {'count': 0})
+        current_stage = current['stages'].get(stage, {'count': 0})
+        if baseline_stage['count'] == 0 or current_stage['count'] == 0:
+            continue
+        for statistic in ['p50', 'p95']:
+            if current_stage[statistic] > baseline_stage[statistic] * limit:
+                regressions.append('{} {}: {:.2f} ms -> {:.2f} ms'.format(stage, statistic, baseline_stage[statistic] * 1000,
+                                                                          current_stage[statistic] * 1000))
+
+    baseline_throughput = baseline['throughput']['faces_per_second']
+    current_throughput = current['throughput']['faces_per_second']
+    if current_throughput * limit < baseline_throughput:
+        regressions.append('throughput: {:.2f} faces/s -> {:.2f} faces/s'.format(baseline_throughput, current_throughput))
+
+    if baseline.get('memory_mb') is not None and current.get('memory_mb') is not None:
+        if current['memory_mb'] > baseline['memory_mb'] * limit:
+            regressions.append('memory: {:.1f} MB -> {:.1f} MB'.format(baseline['memory_mb'], current['memory_mb']))
+
+    if len(regressions) > 0:
+        logger.warning('Found {} regression(s) beyond the budget of {}%:'.format(len(regressions), budget))
+        for regression in regressions:
+            logger.warning(regression)
+        return 1
+    else:
+        logger.info('No regressions beyond the budget of {}%.'.format(budget))
+        return 0
+
+
+def run_compare(arguments):
+    return compare_results(load_results(arguments.baseline), load_results(arguments.current), arguments.budget)
+
+
+# Checks how often the cascade detector gives a different answer than the CNN detector alone to the question of whether there is a face in
+# the photo, and how much time it saves.
+def run_cascade_evaluation(arguments):
+    fixtures = load_fixtures(arguments.input, 0)
+    if len(fixtures) == 0:
+        logger.error('There are no photos to evaluate. Use --input with a folder of photos.')
+        return 1
+
+    predictor = get_predictor()
+    cnn_times = []
+    cascade_times = []
+    disagreements = []
+    different_counts = 0
+    for name, image_data in fixtures:
+        image_matrix = decode_image(image_data)
+        if image_matrix is None:
+            continue
+        resized_image, _ = resize_for_detection(image_matrix)
+
+        start = perf_counter()
+        cnn_boxes = predictor.run_face_detector(resized_image)
+        cnn_times.append(perf_counter() - start)
+
+        start = perf_counter()
+        cascade_boxes = predictor.run_cascade_face_detector(resized_image)
+        cascade_times.append(perf_counter() - start)
+
+        if (len(cnn_boxes) > 0) != (len(cascade_boxes) > 0):
+            disagreements.append('{}: CNN {} face(s), cascade {} face(s)'.format(name, len(cnn_boxes), len(cascade_boxes)))
+        elif len(cnn_boxes) != len(cascade_boxes):
+            different_counts += 1
+
+    # The first photo includes the load of the detectors.
+    evaluated_photos = len(cnn_times)
+    if evaluated_photos == 0:
+        logger.error('None of the {} photo(s) could be decoded, there is nothing to evaluate.'.format(len(fixtures)))
+        return 1
+    cnn_summary = summarize(cnn_times[1:] or cnn_times, PERCENTILES)
+    cascade_summary = summarize(cascade_times[1:] or cascade_times, PERCENTILES)
+    print('Photos evaluated: {}.'.format(evaluated_photos))
+    print('Face / no face disagreements: {} ({:.1f}%).'.format(len(disagreements), 100 * len(disagreements) / evaluated_photos))
+    print('Same answer with a different number of faces: {}.'.format(different_counts))
+    print('CNN only: mean {:.2f} ms, p95 {:.2f} ms.'.format(cnn_summary['mean'] * 1000, cnn_summary['p95'] * 1000))
+    print('Cascade: mean {:.2f} ms, p95 {:.2f} ms.'.format(cascade_summary['mean'] * 1000, cascade_summary['p95'] * 1000))
+    for disagreement in disagreements:
+        print(disagreement)
+
+    return 0
+
+
+# Compares the detection at the size used before, where the photos smaller than 640 pixels were always enlarged, with the detection in a
+# reduced image first and enlarged only when no face is found, for each of the given sizes. The time includes the decoding of the photo.
+def run_resolution_comparison(arguments):
+    fixtures = load_fixtures(arguments.input, 0)
+    if len(fixtures) == 0:
+        logger.error('There are no photos to compare. Use --input with a folder of photos.')
+        return 1
+
+    predictor = get_predictor()
+    predictor.get_face_detector()
+    policies = ['previous'] + ['adaptive {}'.format(size) for size in arguments.sizes]
+    results = {policy: {'times': [], 'photos_with_faces': 0, 'faces': 0, 'second_passes': 0, 'disagreements': 0} for policy in policies}
+    for _, image_data in fixtures:
+        start = perf_counter()
+        image_matrix = decode_image(image_data)
+        if image_matrix is None:
+            continue
+        resized_image, _ = resize_for_detection(image_matrix)
+        previous_boxes = predictor.find_faces(resized_image)
+        add_resolution_result(results['previous'], perf_counter() - start, previous_boxes, previous_boxes, False)
+
+        for size in arguments.sizes:
+            start = perf_counter()
+            detection = predictor.detect_faces(decode_image(image_data), detection_size=size)
+            elapsed_time = perf_counter() - start
+            second_pass = detection.scale != reduce_for_detection(detection.image, size)[1]
+            add_resolution_result(results['adaptive {}'.format(size)], elapsed_time, detection.boxes, previous_boxes, second_pass)
+
+    evaluated_photos = len(results['previous']['times'])
+    if evaluated_photos == 0:
+        logger.error('None of the {} photo(s) could be decoded, there is nothing to compare.'.format(len(fixtures)))
+        return 1
+    print('Photos evaluated: {}.'.format(evaluated_photos))
+    print('{:<16}{:>12}{:>12}{:>16}{:>10}{:>16}{:>16}'.format('Policy', 'Mean (ms)', 'p95 (ms)', 'With faces (%)', 'Faces',
+                                                            'Second passes', 'Disagreements'))
+    for policy, result in results.items():
+        summary = summarize(result['times'], PERCENTILES)
+        print('{:<16}{:>12.2f}{:>12.2f}{:>16.1f}{:>10}{:>16}{:>16}'.format(policy, summary['mean'] * 1000, summary['p95'] * 1000,
+                                                                          100 * result['photos_with_faces'] / evaluated_photos,
+                                                                          result['faces'], result['second_passes'],
+                                                                          result['disagreements']))
+
+    return 0
+
+
+# A disagreement is a photo where one policy finds faces and the other does not.
+def add_resolution_result(result, elapsed_time, boxes, previous_boxes, second_pass):
+    result['times'].append(elapsed_time)
+    result['faces'] += len(boxes)
+    result['photos_with_faces'] += 1 if len(boxes) > 0 else 0
+    result['second_passes'] += 1 if second_pass else 0
+    result['disagreements'] += 1 if (len(boxes) > 0) != (len(previous_boxes) > 0) else 0
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8' if self.path.endswith('.html') else 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+# Serves each local photo at an original size of Tinder and at its smaller size, and compares downloading the original size of every
+# photo with checking for faces in the smaller size first and downloading the original size only for the photos with faces.
+def run_variants_comparison(arguments):
+    import cv2
+
+    fixtures = load_fixtures(arguments.input, 0)
+    files = {}
+    urls = []
+    for index, (_, image_data) in enumerate(fixtures):
+        image_matrix = decode_image(image_data)
+        if image_matrix is None:
+            continue
+        original_size = '/640x800_' if image_matrix.shape[0] > image_matrix.shape[1] else '/640x640_'
+        url_path = '/photos{}{}.jpg'.format(original_size, index)
+        for size in [original_size, FACE_CHECK_SIZE_MAPPING.get(original_size, original_size)]:
+            width, height = (int(value) for value in size.strip('/_').split('x'))
+            encoded_image = cv2.imencode('.jpg', cv2.resize(image_matrix, (width, height), interpolation=cv2.INTER_AREA))[1]
+            files[url_path.replace(original_size, size)] = encoded_image.tobytes()
+        urls.append(url_path)
+    if len(urls) == 0:
+        logger.error('There are no photos to serve. Use --input with a folder of photos.')
+        return 1
+
+    server = HTTPServer(('127.0.0.1', 0), FixtureRequestHandler)
+    server.files = files
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+    predictor = get_predictor()
+    predictor.get_face_detector()
+    results = {}
+    for policy in ['original', 'face check']:
+        http_client = HttpClient(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, 0, 0, MAX_PHOTO_SIZE)
+        times = []
+        photos_with_faces = 0
+        for url_path in urls:
+            url = base_url + url_path
+            start = perf_counter()
+            image_data = http_client.get(url if policy == 'original' else get_face_check_url(url))
+            image_matrix = None if image_data is None else decode_image(image_data)
+            if image_matrix is None:
+                logger.warning('Could not download or decode {}, skipping it.'.format(url))
+                continue
+            detection = predictor.detect_faces(image_matrix)
+            if len(detection.boxes) > 0:
+                photos_with_faces += 1
+                if policy == 'face check':
+                    original_data = http_client.get(url)
+                    if original_data is not None:
+                        decode_image(original_data)
+            times.append(perf_counter() - start)
+        results[policy] = {'times': times, 'photos_with_faces': photos_with_faces, 'bytes': http_client.bytes_transferred,
+                           'requests': len(http_client.latencies)}
+        http_client.close()
+    server.shutdown()
+
+    print('Photos served: {}.'.format(len(urls)))
+    print('{:<12}{:>12}{:>18}{:>12}{:>12}{:>14}'.format('Policy', 'Requests', 'Downloaded (MB)', 'Mean (ms)', 'p95 (ms)', 'With faces'))
+    for policy, result in results.items():
+        summary = summarize(result['times'], PERCENTILES)
+        if summary['count'] == 0:
+            print('{:<12}{:>12}  No photo could be downloaded.'.format(policy, result['requests']))
+            continue
+        print('{:<12}{:>12}{:>18.2f}{:>12.2f}{:>12.2f}{:>14}'.format(policy, result['requests'], result['bytes'] / (1024 * 1024),
+                                                                    summary['mean'] * 1000, summary['p95'] * 1000,
+                                                                    result['photos_with_faces']))
+
+    return 0
+
+
+# Pages where the element of the XPath //*[@id="target"] becomes ready after a delay, with the condition waited for, the initial content
+# of the page and the change that makes the element ready. The element of the last page never becomes ready.
+READINESS_FIXTURES = {
+    'inserted': ('clickable', '', "var node = document.createElement('button'); node.id = 'target'; node.textContent = 'Target'; "
+                                  "document.body.appendChild(node);"),
+    'shown': ('clickable', '<button id="target" style="display: none">Target</button>',
+              "document.getElementById('target').style.display = 'block';"),
+    'photo': ('background_image', '<div id="target" style="width: 64px; height: 64px"></div>',
+              "document.getElementById('target').style.backgroundImage = 'url(\"/photo.jpg\")';"),
+    'missing': ('present', '', '')
+}
+READINESS_PAGE = '<!DOCTYPE html><html><body>{}<script>setTimeout(function () {{ {} }}, {});</script></body></html>'
+READINESS_XPATH = '//*[@id="target"]'
+
+
+def wait_with_web_driver_wait(driver, condition, timeout):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as ec
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    def has_background_image(web_driver):
+        try:
+            return web_driver.find_element_by_xpath(READINESS_XPATH).value_of_css_property('background-image') != 'none'
+        except NoSuchElementException:
+            return False
+
+    # The same polling as the bot used.
+    web_driver_wait = WebDriverWait(driver, timeout=timeout, poll_frequency=1, ignored_exceptions=[])
+    if condition == 'present':
+        web_driver_wait.until(ec.presence_of_element_located((By.XPATH, READINESS_XPATH)))
+    elif condition == 'clickable':
+        web_driver_wait.until(ec.element_to_be_clickable((By.XPATH, READINESS_XPATH)))
+    else:
+        web_driver_wait.until(has_background_image)
+
+
+# Serves pages where an element becomes ready after a delay and compares how long WebDriverWait and the waits of page_readiness.py take
+# to notice it, in a headless Firefox. The results of the waits are checked by the tests, with the pages of tests/fixtures.
+def run_readiness_comparison(arguments):
+    from page_readiness import PageReadiness
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.firefox.options import Options
+
+    files = {}
+    for name, (_, initial_content, change) in READINESS_FIXTURES.items():
+        for delay in arguments.delays:
+            files['/{}-{}.html'.format(name, delay)] = READINESS_PAGE.format(initial_content, change, delay).encode('utf-8')
+    server = HTTPServer(('127.0.0.1', 0), FixtureRequestHandler)
+    server.files = files
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+    options = Options()
+    options.add_argument('--headless')
+    driver = webdriver.Firefox(firefox_options=options)
+    page_readiness = PageReadiness(driver, arguments.timeout)
+    results = []
+    try:
+        for name, (condition, _, _) in READINESS_FIXTURES.items():
+            for delay in arguments.delays:
+                times = {}
+                for method in ['WebDriverWait', 'readiness']:
+                    driver.get('{}/{}-{}.html'.format(base_url, name, delay))
+                    start = perf_counter()
+                    try:
+                        if method == 'WebDriverWait':
+                            wait_with_web_driver_wait(driver, condition, arguments.timeout)
+                        else:
+                            page_readiness.wait(READINESS_XPATH, condition)
+                        times[method] = perf_counter() - start
+                    except TimeoutException:
+                        times[method] = None
+                results.append((name, delay, times))
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    print('{:<12}{:>12}{:>20}{:>16}'.format('Page', 'Delay (ms)', 'WebDriverWait (ms)', 'Readiness (ms)'))
+    for name, delay, times in results:
+        columns = ['timeout' if elapsed_time is None else '{:.0f}'.format(elapsed_time * 1000) for elapsed_time in times.values()]
+        print('{:<12}{:>12}{:>20}{:>16}'.format(name, delay, *columns))
+
+    return 0
+
+
+# Runs in a new process, so the memory of each backend is measured alone.
+def measure_backend(backend, normed_images, repeat):
+    rss_before_load = get_memory_usage_mb()
+    predictor = BeautyPredictor(backend)
+    start = perf_counter()
+    predictions = predictor.run_model(normed_images)
+    first_call_time = perf_counter() - start
+
+    # One face at a time, like most of the photos of the profiles.
+    latencies = []
+    for _ in range(repeat):
+        for face in normed_images:
+            start = perf_counter()
+            predictor.run_model(face[np.newaxis])
+            latencies.append(perf_counter() - start)
+    rss_after_load = get_memory_usage_mb()
+    rss = None if rss_before_load is None else rss_after_load - rss_before_load
+
+    return predictions, first_call_time, latencies, rss
+
+
+# Scores the same faces with every backend and compares the scores with the ones of the Keras backend, which runs the original model.
+def run_backend_comparison(arguments):
+    fixtures = load_fixtures(arguments.input, 0)
+    predictor = get_predictor()
+    detections = []
+    for _, image_data in fixtures:
+        image_matrix = decode_image(image_data)
+        if image_matrix is not None:
+            detections.append(predictor.detect_faces(image_matrix))
+    normed_images, _ = predictor.prepare_faces(detections)
+    if len(normed_images) == 0:
+        logger.error('There are no faces to compare. Use --input with a folder of photos with faces.')
+        return 1
+
+    backends = [backend for backend in arguments.backends if os.path.isfile(get_backend_model_path(backend))]
+    if 'keras' not in backends:
+        logger.error('The Keras backend is needed as reference, its model does not exist: {}.'.format(get_backend_model_path('keras')))
+        return 1
+    for backend in arguments.backends:
+        if backend not in backends:
+            logger.warning('Skipping the {} backend, its model does not exist. Generate it with convert_model.py.'.format(backend))
+
+    face_owners = list(range(len(normed_images)))
+    results = {}
+    for backend in backends:
+        with get_context('spawn').Pool(1) as pool:
+            predictions, first_call_time, latencies, rss = pool.apply(measure_backend, (backend, normed_images, arguments.repeat))
+        scores = np.array([punctuations[0] for punctuations in BeautyPredictor.map_scores(predictions, face_owners, len(face_owners))])
+        results[backend] = {'scores': scores, 'first_call_time': first_call_time, 'latency': summarize(latencies, PERCENTILES), 'rss': rss}
+
+    print('Faces compared: {}.'.format(len(normed_images)))
+    print('{:<16}{:>16}{:>16}{:>12}{:>12}{:>12}'.format('Backend', 'Max deviation', 'First call (s)', 'p50 (ms)', 'p95 (ms)', 'RSS (MB)'))
+    reference_scores = results['keras']['scores']
+    for backend, result in results.items():
+        deviation = float(np.max(np.abs(result['scores'] - reference_scores)))
+        rss = 'n/a' if result['rss'] is None else '{:.1f}'.format(result['rss'])
+        print('{:<16}{:>16.4f}{:>16.2f}{:>12.2f}{:>12.2f}{:>12}'.format(backend, deviation, result['first_call_time'],
+                                                                        result['latency']['p50'] * 1000,
+                                                                        result['latency']['p95'] * 1000, rss))
+
+    return 0
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the prediction pipeline with local photos.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    parser_run = subparsers.add_parser('run', help='Measure the pipeline and save the results.')
+    parser_run.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser_run.add_argument('--generate', type=int, default=0, help='Number of generated photos to add to the local photos.')
+    parser_run.add_argument('--repeat', type=int, default=3, help='Number of times each photo is measured.')
+    parser_run.add_argument('--output', default='benchmark.json', help='File where the results are saved.')
+    parser_run.add_argument('--baseline', default=None, help='Results to compare with after measuring.')
+    parser_run.add_argument('--budget', type=float, default=10, help='Allowed slowdown in percentage before reporting a regression.')
+    parser_run.set_defaults(function=run_benchmark)
+
+    parser_compare = subparsers.add_parser('compare', help='Compare two saved results.')
+    parser_compare.add_argument('baseline', help='Results used as reference.')
+    parser_compare.add_argument('current', help='Results to check.')
+    parser_compare.add_argument('--budget', type=float, default=10, help='Allowed slowdown in percentage before reporting a regression.')
+    parser_compare.set_defaults(function=run_compare)
+
+    parser_cascade = subparsers.add_parser('cascade', help='Compare the cascade face detector with the CNN face detector.')
+    parser_cascade.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser_cascade.set_defaults(function=run_cascade_evaluation)
+
+    parser_resolution = subparsers.add_parser('resolution', help='Compare the sizes of the first pass of the face detector.')
+    parser_resolution.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser_resolution.add_argument('--sizes', nargs='+', type=int, default=[DETECTION_SIZE], help='Sizes of the first pass to compare.')
+    parser_resolution.set_defaults(function=run_resolution_comparison)
+
+    parser_variants = subparsers.add_parser('variants', help='Compare checking for faces in the smaller size of the photos first.')
+    parser_variants.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser_variants.set_defaults(function=run_variants_comparison)
+
+    parser_backends = subparsers.add_parser('backends', help='Compare the scores, latency and memory of the inference backends.')
+    parser_backends.add_argument('--input', default=samples_folder, help='Folder with the photos, it is read recursively.')
+    parser_backends.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS, help='Backends to compare.')
+    parser_backends.add_argument('--repeat', type=int, default=3, help='Number of times each face is measured.')
+    parser_backends.set_defaults(function=run_backend_comparison)
+
+    parser_readiness = subparsers.add_parser('readiness', help='Compare WebDriverWait with the waits in the browser on local pages.')
+    parser_readiness.add_argument('--delays', nargs='+', type=int, default=[300, 1200], help='Delays in ms until the element is ready.')
+    parser_readiness.add_argument('--timeout', type=float, default=3, help='Maximum time in seconds of each wait.')
+    parser_readiness.set_defaults(function=run_readiness_comparison)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":  # Execute only if run as a script
+    arguments = parse_arguments()
+    sys.exit(arguments.function(arguments))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+try:
+    import hashlib
+    import sqlite3
+    import sys
+    from time import time
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Returns the link and the text shown in the list of matches of every chat with a single call to the browser, in the same order as the
+# <a> tags of the list. The text is the preview of the last message of the chat.
+CHAT_PREVIEWS_SCRIPT = '''
+var list = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (list === null) {
+    return [];
+}
+return Array.prototype.map.call(list.getElementsByTagName('a'), function (chat) {
+    return {link: chat.getAttribute('href'), preview: chat.textContent};
+});
+'''
+
+WAITING_ACTION = 'waiting'
+SENT_ACTION = 'sent'
+
+
+def read_chat_previews(driver, list_xpath):
+    return driver.execute_script(CHAT_PREVIEWS_SCRIPT, list_xpath)
+
+
+def fingerprint_preview(preview):
+    return hashlib.sha256(preview.encode('utf-8')).hexdigest()
+
+
+# Every execution opened the chat of every match to know whether it had answered, even if nothing had changed since the previous
+# execution. The state of each chat is stored on disk, identified by its link, with the fingerprint of its preview in the list of matches
+# and the last action of the bot. A chat left waiting for an answer is not opened again until its preview changes. After sending a message
+# the preview is not stored, so the chat is checked again in the next execution.
+class ConversationState:
+    CREATE_TABLE = 'CREATE TABLE IF NOT EXISTS conversations (link TEXT PRIMARY KEY, preview TEXT, last_action TEXT NOT NULL, ' \
+                   'last_update REAL NOT NULL)'
+
+    def __init__(self, path):
+        self.opened_chats = 0
+        self.skipped_chats = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(self.CREATE_TABLE)
+        self.connection.commit()
+
+    def is_waiting_unchanged(self, link, preview_fingerprint):
+        row = self.connection.execute('SELECT preview, last_action FROM conversations WHERE link = ?', (link,)).fetchone()
+        unchanged = row is not None and row[1] == WAITING_ACTION and row[0] == preview_fingerprint
+        if unchanged:
+            self.skipped_chats += 1
+        else:
+            self.opened_chats += 1
+
+        return unchanged
+
+    def update(self, link, preview_fingerprint, action):
+        self.connection.execute('INSERT OR REPLACE INTO conversations (link, preview, last_action, last_update) VALUES (?, ?, ?, ?)',
+                                (link, preview_fingerprint, action, time()))
+        self.connection.commit()
+
+    def report(self):
+        logger.info('Conversations: {} chat(s) opened, {} skipped because they did not change.'.format(self.opened_chats,
+                                                                                                      self.skipped_chats))
+
+    def close(self):
+        self.connection.close()
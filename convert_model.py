@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+try:
+    import argparse
+    import os
+    import sys
+    from time import perf_counter
+
+    from batch_predict import find_images
+    from inference_backends import get_backend_model_path, weights_path
+    from logger import logger
+    import numpy as np
+    from predict import get_predictor, load_image, samples_folder
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Generates, only once, the copies of the beauty model used by the TFLite and ONNX backends. The int8 model needs some faces to calibrate
+# the range of the values of each layer, they are taken from the local photos.
+
+FORMATS = ['tflite-float16', 'tflite-int8', 'onnx']
+INPUT_SHAPE = (None, 224, 224, 3)
+
+
+# The converters need a TensorFlow Keras model, it has the same architecture as the model of the Keras backend.
+def build_tensorflow_model():
+    from tensorflow.keras.applications.resnet50 import ResNet50
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.models import Sequential
+
+    resnet = ResNet50(include_top=False, pooling='avg', weights=None, input_shape=INPUT_SHAPE[1:])
+    model = Sequential()
+    model.add(resnet)
+    model.add(Dense(5, activation='softmax'))
+    model.load_weights(weights_path)
+
+    return model
+
+
+def load_calibration_faces(input_folder, maximum_faces):
+    detections = []
+    for image_path in find_images(input_folder):
+        image_matrix = load_image(image_path)
+        if image_matrix is not None:
+            detections.append(get_predictor().detect_faces(image_matrix))
+        if sum(len(detection.boxes) for detection in detections) >= maximum_faces:
+            break
+
+    normed_images = get_predictor().prepare_faces(detections)[0]
+    if len(normed_images) == 0:
+        # The calibration with generated faces works, but the int8 model is less accurate.
+        logger.warning('No faces found in {}, the int8 model is calibrated with generated faces.'.format(input_folder))
+        normed_images = np.random.RandomState(0).uniform(-1, 1, size=(maximum_faces,) + INPUT_SHAPE[1:]).astype(np.float32)
+
+    return normed_images[:maximum_faces]
+
+
+def convert_to_tflite(model, output_path, calibration_faces=None):
+    import tensorflow
+
+    converter = tensorflow.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tensorflow.lite.Optimize.DEFAULT]
+    if calibration_faces is None:
+        converter.target_spec.supported_types = [tensorflow.float16]
+    else:
+        # The weights and the activations are int8, the input and the output are still float32 so the backend does not change them.
+        converter.representative_dataset = lambda: ([face[np.newaxis]] for face in calibration_faces)
+        converter.target_spec.supported_ops = [tensorflow.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(output_path, 'wb') as model_file:
+        model_file.write(converter.convert())
+
+
+def convert_to_onnx(model, output_path):
+    import tensorflow
+    import tf2onnx
+
+    input_signature = (tensorflow.TensorSpec(INPUT_SHAPE, tensorflow.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=13, output_path=output_path)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Converts the beauty model for the TFLite and ONNX backends.')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS, help='Models to generate. By default, all of them.')
+    parser.add_argument('--input', default=samples_folder, help='Folder with the photos used to calibrate the int8 model.')
+    parser.add_argument('--calibration-faces', type=int, default=100, help='Maximum number of faces used to calibrate the int8 model.')
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    if not os.path.isfile(weights_path):
+        logger.error('The weights of the beauty model do not exist: {}.'.format(weights_path))
+        return 1
+
+    model = build_tensorflow_model()
+    for model_format in arguments.formats:
+        output_path = get_backend_model_path(model_format)
+        start = perf_counter()
+        if model_format == 'tflite-float16':
+            convert_to_tflite(model, output_path)
+        elif model_format == 'tflite-int8':
+            convert_to_tflite(model, output_path, load_calibration_faces(arguments.input, arguments.calibration_faces))
+        else:
+            convert_to_onnx(model, output_path)
+        logger.info('Generated the {} model in {:.2f} s: {} ({:.1f} MB).'.format(model_format, perf_counter() - start, output_path,
+                                                                              os.path.getsize(output_path) / (1024 * 1024)))
+
+    return 0
+
+
+if __name__ == "__main__":  # Execute only if run as a script
+    sys.exit(main())
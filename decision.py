@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+try:
+    from statistics import median
+    import sys
+    import threading
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# In the fast mode the number of faces of the photos that have not been analyzed yet is unknown, so each photo is expected to have one face.
+FAST_MODE_FACES_PER_PHOTO = 1
+
+
+# Follows the median of the scores of a profile as they are calculated to know if the decision of liking it can still change. The faces that
+# are still pending could get any score, so the lowest possible median is the one where all of them get a score below any possible score and
+# the highest possible median is the one where all of them get a score above any possible score. If both medians are on the same side of
+# the threshold, the decision is settled and the remaining faces do not need to be scored. If some of the pending faces are finally not
+# scored, the median is still between those two values.
+class MedianDecision:
+    # The mapped scores go from 0 to 9.
+    LOWEST_SCORE = -1
+    HIGHEST_SCORE = 10
+
+    def __init__(self, threshold, pending_faces):
+        self.threshold = threshold
+        self.pending_faces = pending_faces
+        self.scores = []
+
+    # Adds the scores of a photo, the expected faces are the faces of the photo that were counted as pending.
+    def add_scores(self, scores, expected_faces):
+        self.scores.extend(scores)
+        self.pending_faces = max(0, self.pending_faces - expected_faces)
+
+    def get_bounds(self):
+        lowest_scores = self.scores + [self.LOWEST_SCORE] * self.pending_faces
+        highest_scores = self.scores + [self.HIGHEST_SCORE] * self.pending_faces
+        if len(lowest_scores) == 0:
+            # Without scores the average score is 0, see calculate_average_score.
+            return 0, 0
+
+        return median(lowest_scores), median(highest_scores)
+
+    def is_settled(self):
+        lowest_median, highest_median = self.get_bounds()
+
+        return (lowest_median >= self.threshold) == (highest_median >= self.threshold)
+
+    # Returns the fewest pending faces that have to be scored before the decision can be settled. The decision settles soonest when every
+    # new score is the lowest or the highest possible score, so with fewer faces it cannot be settled whatever their scores are.
+    def get_faces_to_settle(self):
+        for faces in range(self.pending_faces + 1):
+            remaining_faces = self.pending_faces - faces
+            for score in [self.LOWEST_SCORE, self.HIGHEST_SCORE]:
+                decision = MedianDecision(self.threshold, remaining_faces)
+                decision.scores = self.scores + [score] * faces
+                if decision.is_settled():
+                    return faces
+
+        return self.pending_faces
+
+
+# Follows the decision in the swipe pipeline, where the faces of a photo are detected while the previous photos are scored, each stage in
+# its own thread. In the strict mode the faces of a photo are pending once they are detected, so the decision cannot be settled until
+# every photo of the profile has been detected. In the fast mode every photo is expected to have one face since the beginning.
+class PipelineDecision(MedianDecision):
+
+    def __init__(self, threshold, number_of_photos, strict):
+        super().__init__(threshold, 0 if strict else number_of_photos * FAST_MODE_FACES_PER_PHOTO)
+        self.strict = strict
+        self.undetected_photos = number_of_photos if strict else 0
+        self.skipped_photos = 0
+        self.lock = threading.Lock()
+
+    # The photos that could not be downloaded or decoded have no faces.
+    def add_detection(self, faces):
+        with self.lock:
+            if self.strict:
+                self.undetected_photos = max(0, self.undetected_photos - 1)
+                self.pending_faces += faces
+            elif faces == 0:
+                self.pending_faces = max(0, self.pending_faces - FAST_MODE_FACES_PER_PHOTO)
+
+    def add_photo_scores(self, scores, faces):
+        with self.lock:
+            self.add_scores(scores, faces if self.strict else FAST_MODE_FACES_PER_PHOTO)
+
+    # Returns whether a photo can be skipped, counting it as skipped.
+    def skip_photo(self):
+        with self.lock:
+            if self.undetected_photos > 0 or not self.is_settled():
+                return False
+            self.skipped_photos += 1
+
+            return True
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+try:
+    import sys
+    import threading
+    from time import perf_counter
+
+    from logger import logger
+    import requests
+    from requests.adapters import HTTPAdapter
+    from timing import summarize
+    from urllib3.util.retry import Retry
+
+    from resources.constants import FACE_CHECK_SIZE_MAPPING
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+# Returns the URL of the smaller size of the photo used to check whether there is a face in it, or the same URL if the size of the photo
+# does not have a smaller size.
+def get_face_check_url(photo_url):
+    for original_size, face_check_size in FACE_CHECK_SIZE_MAPPING.items():
+        if original_size in photo_url:
+            return photo_url.replace(original_size, face_check_size)
+
+    return photo_url
+
+
+# Shared client for all the downloads of the bot. The connections to the server are reused between requests instead of opening a new
+# connection for each photo, every request has a time limit and the failed requests are retried a few times waiting longer each time. The
+# body of the response is read in chunks and the download is cancelled if it exceeds the maximum size.
+class HttpClient:
+    CHUNK_SIZE = 64 * 1024
+    RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+    def __init__(self, connect_timeout, read_timeout, retries, backoff_factor, max_size, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_size = max_size
+
+        retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=self.RETRY_STATUS_CODES, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # The client is used from the threads that download the photos in advance.
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.bytes_transferred = 0
+        self.failed_requests = 0
+
+    # Returns the body of the response or None if the request failed.
+    def get(self, url):
+        start = perf_counter()
+        content = None
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 200:
+                    content = self.read_body(response)
+                else:
+                    logger.warning('Unexpected status code {} from URL: {}.'.format(response.status_code, url))
+        except requests.exceptions.ConnectionError:
+            logger.warning('Max retries exceeded with URL {}. Temporary failure in name resolution.'.format(url))
+        except requests.exceptions.Timeout:
+            logger.warning('Timeout exception when fetching URL: {}.'.format(url))
+        except requests.exceptions.RequestException as error:
+            logger.warning('Could not fetch URL {}: {}.'.format(url, error))
+        except ResponseTooLarge:
+            logger.warning('The response from URL {} exceeds the maximum size of {} bytes, skipping.'.format(url, self.max_size))
+
+        with self.lock:
+            self.latencies.append(perf_counter() - start)
+            if content is None:
+                self.failed_requests += 1
+            else:
+                self.bytes_transferred += len(content)
+
+        return content
+
+    def read_body(self, response):
+        content_length = response.headers.get('Content-Length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            raise ResponseTooLarge
+
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) > self.max_size:
+                raise ResponseTooLarge
+
+        return bytes(body)
+
+    def report(self):
+        if len(self.latencies) == 0:
+            return
+
+        summary = summarize(self.latencies, [50, 95])
+        logger.info('HTTP requests: {} ({} failed), {:.2f} MB transferred. Latency: mean {:.3f} s, p50 {:.3f} s, p95 {:.3f} s.'.format(
+            summary['count'], self.failed_requests, self.bytes_transferred / (1024 * 1024), summary['mean'], summary['p50'],
+            summary['p95']))
+
+    def close(self):
+        self.session.close()
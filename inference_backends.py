@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+try:
+    import os.path
+    import sys
+
+    from logger import logger
+    import numpy as np
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# The beauty model can be run by different libraries. Keras runs the original model and the rest run a copy of it generated once with
+# convert_model.py, which is lighter and faster on a CPU, specially on ARM. Every backend receives the normalized batch of faces and returns
+# the probabilities of the five scores of each face.
+
+parent_path = os.path.dirname(os.path.abspath(__file__))
+weights_path = os.path.join(parent_path, 'beauty', 'model-ldl-resnet.h5')
+
+BACKEND_MODEL_PATHS = {
+    'keras': weights_path,
+    'tflite-float16': os.path.join(parent_path, 'beauty', 'model-ldl-resnet-float16.tflite'),
+    'tflite-int8': os.path.join(parent_path, 'beauty', 'model-ldl-resnet-int8.tflite'),
+    'onnx': os.path.join(parent_path, 'beauty', 'model-ldl-resnet.onnx')
+}
+BACKENDS = list(BACKEND_MODEL_PATHS)
+
+
+class KerasBackend:
+
+    def __init__(self, threads=None):
+        if threads is not None:
+            import tensorflow
+
+            tensorflow.config.threading.set_intra_op_parallelism_threads(threads)
+            tensorflow.config.threading.set_inter_op_parallelism_threads(threads)
+        self.model = self.build_model()
+
+    @staticmethod
+    def build_model():
+        # Keras takes several seconds to be imported, so it is only imported when the model is needed.
+        from keras.applications.resnet50 import ResNet50
+        from keras.layers import Dense
+        from keras.models import Sequential
+
+        resnet = ResNet50(include_top=False, pooling='avg')
+        model = Sequential()
+        model.add(resnet)
+        model.add(Dense(5, activation='softmax'))
+        model.layers[0].trainable = False
+        model.load_weights(weights_path)
+
+        return model
+
+    def predict(self, normed_images):
+        try:
+            return self.model.predict(normed_images, batch_size=len(normed_images))
+        except ValueError:
+            # This is the error that clearing the session after every photo was working around, the graph of the model is left in an
+            # invalid state. The session is cleared and the model is built again only when it happens, and the batch is retried once.
+            from keras.backend import clear_session
+
+            logger.error('The state of the beauty model is not valid, clearing the session and loading the model again.')
+            clear_session()
+            self.model = self.build_model()
+            try:
+                return self.model.predict(normed_images, batch_size=len(normed_images))
+            except ValueError:
+                logger.error('Aborting the process, the beauty model could not be recovered.')
+                return None
+
+
+class TFLiteBackend:
+
+    def __init__(self, model_path, threads=None):
+        # The TFLite runtime is much smaller than TensorFlow, which is only used when the runtime is not installed.
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow
+
+            Interpreter = tensorflow.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=threads)
+        self.interpreter.allocate_tensors()
+        self.batch_size = self.interpreter.get_input_details()[0]['shape'][0]
+
+    def predict(self, normed_images):
+        input_details = self.interpreter.get_input_details()[0]
+        # The converted model expects a fixed number of faces, so it is changed when a batch has a different number of faces.
+        if len(normed_images) != self.batch_size:
+            self.interpreter.resize_tensor_input(input_details['index'], normed_images.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = len(normed_images)
+            input_details = self.interpreter.get_input_details()[0]
+
+        self.interpreter.set_tensor(input_details['index'], quantize(normed_images, input_details))
+        self.interpreter.invoke()
+        output_details = self.interpreter.get_output_details()[0]
+
+        return dequantize(self.interpreter.get_tensor(output_details['index']), output_details)
+
+
+class OnnxBackend:
+
+    def __init__(self, model_path, threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads is not None:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, normed_images):
+        return self.session.run(None, {self.input_name: normed_images})[0]
+
+
+# The int8 models keep the input and the output as float32, but a model with integer input or output is also supported.
+def quantize(values, details):
+    scale, zero_point = details['quantization']
+    if details['dtype'] == np.float32 or scale == 0:
+        return values.astype(details['dtype'], copy=False)
+
+    information = np.iinfo(details['dtype'])
+    return np.clip(np.round(values / scale + zero_point), information.min, information.max).astype(details['dtype'])
+
+
+def dequantize(values, details):
+    scale, zero_point = details['quantization']
+    if details['dtype'] == np.float32 or scale == 0:
+        return values
+
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+def get_backend_model_path(backend):
+    return BACKEND_MODEL_PATHS[backend]
+
+
+def create_backend(backend, threads=None):
+    if backend not in BACKEND_MODEL_PATHS:
+        logger.error('Unknown inference backend: {}. The available backends are: {}.'.format(backend, ', '.join(BACKENDS)))
+        sys.exit(1)
+
+    model_path = get_backend_model_path(backend)
+    if not os.path.isfile(model_path):
+        logger.error('The model of the {} backend does not exist: {}. Generate it with convert_model.py.'.format(backend, model_path))
+        sys.exit(1)
+
+    try:
+        if backend == 'keras':
+            return KerasBackend(threads)
+        elif backend.startswith('tflite'):
+            return TFLiteBackend(model_path, threads)
+        else:
+            return OnnxBackend(model_path, threads)
+    except ImportError as error:
+        logger.error('The library of the {} backend is not installed: {}. Please, check the requirements file.'.format(backend, error))
+        sys.exit(1)
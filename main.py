@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+try:
+    import argparse
+    import importlib
+    import sys
+    from time import perf_counter
+
+    start_time = perf_counter()
+    from logger import logger
+    logger_time = perf_counter() - start_time
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+# Each command only imports the modules it needs, so for example scheduling the bot does not load the browser and reviewing the messages
+# does not load the neural networks. The time spent on each step of the startup is reported to find out where the time goes.
+class StartupTimer:
+
+    def __init__(self):
+        self.stages = [('logger', logger_time)]
+
+    def measure(self, stage, function, *args, **kwargs):
+        start = perf_counter()
+        result = function(*args, **kwargs)
+        self.stages.append((stage, perf_counter() - start))
+
+        return result
+
+    def report(self):
+        total_time = sum(elapsed_time for _, elapsed_time in self.stages)
+        breakdown = ', '.join('{}: {:.2f} s'.format(stage, elapsed_time) for stage, elapsed_time in self.stages)
+        logger.info('Startup time: {:.2f} s ({}).'.format(total_time, breakdown))
+
+
+def start_bot(timer):
+    tinder_bot = timer.measure('import tinder_bot', importlib.import_module, 'tinder_bot')
+    bot = timer.measure('bot', tinder_bot.TinderBot)
+    if timer.measure('browser', bot.check_user_constants):
+        timer.measure('login', bot.login)
+        timer.measure('permission pop-ups', bot.close_permission_popups)
+        timer.report()
+        return bot
+    else:
+        timer.report()
+        return None
+
+
+def run_all(_, timer):
+    bot = start_bot(timer)
+    if bot is not None:
+        bot.auto_swipe()
+        bot.collect_photos_matched_profiles(skip_animation=True)
+        bot.review_messages_from_matching_profiles(skip_animation=True)
+        bot.close_photo_store()
+        bot.check_crontab_entry()
+        bot.exit()
+
+
+def run_swipe(_, timer):
+    bot = start_bot(timer)
+    if bot is not None:
+        bot.auto_swipe()
+        bot.close_photo_store()
+        bot.exit()
+
+
+def run_collect_matches(arguments, timer):
+    bot = start_bot(timer)
+    if bot is not None:
+        bot.collect_photos_matched_profiles(skip_animation=arguments.skip_animation)
+        bot.exit()
+
+
+def run_review_messages(arguments, timer):
+    bot = start_bot(timer)
+    if bot is not None:
+        bot.review_messages_from_matching_profiles(skip_animation=arguments.skip_animation)
+        bot.exit()
+
+
+def run_crontab(arguments, timer):
+    scheduler = timer.measure('import scheduler', importlib.import_module, 'scheduler')
+    timer.report()
+    scheduler.check_crontab_entry(arguments.limit_reached)
+
+
+def run_scoring_daemon(_, timer):
+    scoring_daemon = timer.measure('import scoring_daemon', importlib.import_module, 'scoring_daemon')
+    timer.report()
+    sys.exit(scoring_daemon.serve())
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Tinder bot.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    parser_all = subparsers.add_parser('all', help='Swipe, collect the photos of the matches, review the messages and schedule the bot. '
+                                                   'This is the default command.')
+    parser_all.set_defaults(function=run_all)
+
+    parser_swipe = subparsers.add_parser('swipe', help='Swipe the profiles until there are no more profiles or the limit is reached.')
+    parser_swipe.set_defaults(function=run_swipe)
+
+    # Without swiping first, the bot has to wait until the tutorial animation ends.
+    parser_collect = subparsers.add_parser('collect-matches', help='Download the photos of the matching profiles.')
+    parser_collect.add_argument('--skip-animation', action='store_true', help='Do not wait for the tutorial animation to end.')
+    parser_collect.set_defaults(function=run_collect_matches)
+
+    parser_review = subparsers.add_parser('review-messages', help='Send a message to the matching profiles.')
+    parser_review.add_argument('--skip-animation', action='store_true', help='Do not wait for the tutorial animation to end.')
+    parser_review.set_defaults(function=run_review_messages)
+
+    parser_crontab = subparsers.add_parser('crontab', help='Schedule the next execution of the bot.')
+    parser_crontab.add_argument('--limit-reached', action='store_true', help='Wait until the free matches limit is restored.')
+    parser_crontab.set_defaults(function=run_crontab)
+
+    parser_daemon = subparsers.add_parser('scoring-daemon', help='Keep the models loaded and score the photos of the next executions.')
+    parser_daemon.set_defaults(function=run_scoring_daemon)
+
+    parser.set_defaults(function=run_all)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":  # Execute only if run as a script
+    arguments = parse_arguments()
+    arguments.function(arguments, StartupTimer())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+try:
+    import sys
+    import threading
+    from time import perf_counter
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+# Owns every model of the process, each one is loaded once and the same instance is handed out to every predictor that asks for it. On a
+# Raspberry Pi with 1 or 2 GB of memory, a second copy of the face detector or the beauty model takes a real share of the memory. The load
+# time and the memory taken by each model are logged when it is loaded, the memory is the growth of the resident memory of the process
+# while loading it, so it is approximate.
+class ModelRegistry:
+
+    def __init__(self):
+        # The models can be asked for from several threads, like the stages of the swipe pipeline. Each model has its own lock, so loading a
+        # model does not block the threads that use the models already loaded or load other models.
+        self.lock = threading.Lock()
+        self.model_locks = {}
+        self.models = {}
+        self.load_reports = {}
+
+    def get(self, key, description, loader):
+        model = self.models.get(key)
+        if model is not None:
+            return model
+
+        with self.lock:
+            model_lock = self.model_locks.setdefault(key, threading.Lock())
+        with model_lock:
+            if key not in self.models:
+                memory_before = get_memory_usage_mb()
+                start = perf_counter()
+                model = loader()
+                load_time = perf_counter() - start
+                memory_after = get_memory_usage_mb()
+                memory = None if memory_before is None else max(0.0, memory_after - memory_before)
+                self.load_reports[key] = (description, load_time, memory)
+                self.models[key] = model
+                logger.info('{} loaded in {:.2f} s{}.'.format(description, load_time, format_memory(memory)))
+
+        return self.models[key]
+
+    def report(self):
+        if len(self.load_reports) == 0:
+            logger.info('No model has been loaded.')
+        for description, load_time, memory in self.load_reports.values():
+            logger.info('Model registry: {} loaded in {:.2f} s{}.'.format(description, load_time, format_memory(memory)))
+
+
+def format_memory(memory):
+    return '' if memory is None else ', about {:.1f} MB'.format(memory)
+
+
+# The current resident memory is read from /proc on Linux, the peak resident memory is used on other systems.
+def get_memory_usage_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        pass
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports the value in kilobytes and macOS in bytes.
+    if sys.platform == 'darwin':
+        return peak_rss / (1024 * 1024)
+    else:
+        return peak_rss / 1024
+
+
+registry = ModelRegistry()
+
+
+def get_model_registry():
+    return registry
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+try:
+    import sys
+
+    from selenium.common.exceptions import TimeoutException
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# WebDriverWait asks the browser for the element once per poll, so each wait takes up to a whole poll more than needed and a call to the
+# WebDriver per poll. The script waits in the browser with a MutationObserver and answers as soon as the element is ready, with a single
+# call. The changes that do not modify the DOM, like the end of a CSS animation, are caught by a check every CHECK_INTERVAL milliseconds
+# made in the browser.
+WAIT_FOR_XPATH_SCRIPT = '''
+var xpath = arguments[0];
+var condition = arguments[1];
+var timeout = arguments[2];
+var checkInterval = arguments[3];
+var done = arguments[arguments.length - 1];
+
+function getReadyValue() {
+    var node = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (node === null) {
+        return null;
+    }
+    if (condition === 'present') {
+        return true;
+    }
+    var style = window.getComputedStyle(node);
+    if (condition === 'background_image') {
+        var match = /url\\(["']?(.*?)["']?\\)/.exec(style.backgroundImage);
+        return match === null ? null : match[1];
+    }
+    // Like element_to_be_clickable, the element is visible and enabled.
+    var visible = node.getClientRects().length > 0 && style.visibility !== 'hidden' && style.opacity !== '0';
+    return visible && !node.disabled ? true : null;
+}
+
+var finished = false;
+var observer = null;
+var interval = null;
+var timer = null;
+
+function finish(value) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer !== null) {
+        observer.disconnect();
+    }
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(value);
+}
+
+function check() {
+    var value = getReadyValue();
+    if (value !== null) {
+        finish(value);
+    }
+}
+
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    interval = setInterval(check, checkInterval);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
+'''
+
+CHECK_INTERVAL = 250
+# The script answers when its own timeout expires, the WebDriver waits a bit longer so it does not stop the script first.
+SCRIPT_TIMEOUT_MARGIN = 5
+
+
+# Waits for the elements of the XPaths of firefox_xpaths.py. Like WebDriverWait, a TimeoutException is raised if the element is not ready
+# before the timeout, so it can replace it in the existing waits.
+class PageReadiness:
+
+    def __init__(self, driver, timeout):
+        self.driver = driver
+        self.timeout = timeout
+        self.script_timeout = timeout + SCRIPT_TIMEOUT_MARGIN
+        self.driver.set_script_timeout(self.script_timeout)
+
+    def wait(self, xpath, condition, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        if timeout + SCRIPT_TIMEOUT_MARGIN > self.script_timeout:
+            self.script_timeout = timeout + SCRIPT_TIMEOUT_MARGIN
+            self.driver.set_script_timeout(self.script_timeout)
+        value = self.driver.execute_async_script(WAIT_FOR_XPATH_SCRIPT, xpath, condition, int(timeout * 1000), CHECK_INTERVAL)
+        if value is None:
+            raise TimeoutException('The element is not ready ({}) after {} s: {}.'.format(condition, timeout, xpath))
+
+        return value
+
+    def until_present(self, xpath, timeout=None):
+        self.wait(xpath, 'present', timeout)
+
+    def until_clickable(self, xpath, timeout=None):
+        self.wait(xpath, 'clickable', timeout)
+
+    # Returns the URL of the background image of the element, which is how Tinder shows the photos.
+    def until_background_image(self, xpath, timeout=None):
+        return self.wait(xpath, 'background_image', timeout)
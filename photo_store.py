@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+try:
+    from collections import OrderedDict
+    import os
+    import pathlib
+    import shutil
+    import stat
+    import sys
+    import threading
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+# Keeps the photos of the profiles saved with SAVE_PROFILE_PHOTOS, and the copies with their results, under a maximum size. The photos of a
+# profile are marked as pending until the profile is swiped, then they are kept or deleted. When the photos kept exceed the maximum size,
+# the profiles swiped longest ago are deleted first, also in the next executions. If the bot stops before swiping a profile, its photos are
+# still marked as pending and are deleted the next time the bot starts.
+class PhotoStore:
+    PENDING_MARKER = '.pending'
+
+    def __init__(self, root, results_root, max_size):
+        self.root = root
+        self.results_root = results_root
+        self.max_size = max_size
+        pathlib.Path(self.root).mkdir(exist_ok=True)
+
+        # The photos are saved from the threads that download them in advance.
+        self.lock = threading.Lock()
+        self.profiles = OrderedDict()
+        self.pending_profiles = set()
+        self.deleted_profiles = 0
+        self.evicted_profiles = 0
+        self.evicted_size = 0
+        self.peak_size = 0
+        self.load_profiles()
+
+    def get_profile_folders(self, details):
+        return [os.path.join(self.root, details), os.path.join(self.results_root, details)]
+
+    # The profiles kept by previous executions are loaded from the oldest to the newest, the pending profiles and the results without
+    # photos are left by an execution that did not end properly.
+    def load_profiles(self):
+        orphaned_profiles = set()
+        kept_profiles = []
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or entry.path == self.results_root:
+                continue
+            if os.path.exists(os.path.join(entry.path, self.PENDING_MARKER)):
+                orphaned_profiles.add(entry.name)
+            else:
+                kept_profiles.append((entry.stat().st_mtime, entry.name))
+        if os.path.isdir(self.results_root):
+            for entry in os.scandir(self.results_root):
+                if entry.is_dir() and not os.path.isdir(os.path.join(self.root, entry.name)):
+                    orphaned_profiles.add(entry.name)
+
+        for details in orphaned_profiles:
+            self.remove_profile_folders(details)
+        if len(orphaned_profiles) > 0:
+            logger.info('Removed the photos of {} profile(s) left by a previous execution.'.format(len(orphaned_profiles)))
+
+        for _, details in sorted(kept_profiles):
+            self.profiles[details] = self.get_profile_size(details)
+        self.evict_profiles()
+
+    def save_photo(self, details, image_name, image_data):
+        profile_folder = os.path.join(self.root, details)
+        with self.lock:
+            if details not in self.pending_profiles:
+                pathlib.Path(profile_folder).mkdir(exist_ok=True)
+                # The marker is written before the first photo, so a photo is never left without it.
+                pathlib.Path(os.path.join(profile_folder, self.PENDING_MARKER)).touch()
+                self.pending_profiles.add(details)
+                # A profile seen again is pending again.
+                self.profiles.pop(details, None)
+
+        image_path = os.path.join(profile_folder, image_name)
+        with open(image_path, 'wb') as file:
+            file.write(image_data)
+
+        return image_path
+
+    # Called once the profile has been swiped, the photos of every profile saved since the previous call are kept or deleted.
+    def finish_profile(self, keep):
+        with self.lock:
+            pending_profiles = self.pending_profiles
+            self.pending_profiles = set()
+
+        for details in pending_profiles:
+            if keep:
+                os.remove(os.path.join(self.root, details, self.PENDING_MARKER))
+                self.profiles[details] = self.get_profile_size(details)
+            else:
+                self.remove_profile_folders(details)
+                self.deleted_profiles += 1
+        self.evict_profiles()
+
+    def evict_profiles(self):
+        total_size = self.get_total_size()
+        self.peak_size = max(self.peak_size, total_size)
+        while total_size > self.max_size and len(self.profiles) > 0:
+            details, size = self.profiles.popitem(last=False)
+            self.remove_profile_folders(details)
+            total_size -= size
+            self.evicted_profiles += 1
+            self.evicted_size += size
+
+    def get_total_size(self):
+        return sum(self.profiles.values())
+
+    def get_profile_size(self, details):
+        size = 0
+        for folder in self.get_profile_folders(details):
+            for root, _, files in os.walk(folder):
+                size += sum(os.path.getsize(os.path.join(root, file)) for file in files)
+
+        return size
+
+    def remove_profile_folders(self, details):
+        for folder in self.get_profile_folders(details):
+            if os.path.isdir(folder):
+                try:
+                    shutil.rmtree(folder, onerror=remove_readonly_files_windows)
+                except OSError:
+                    logger.error('Failed to remove photo folder: {}.'.format(folder))
+
+    # Called when the bot ends, instead of removing the whole folder. The kept photos stay for the next executions and the usage is reported
+    # before anything is removed, otherwise the whole store is removed.
+    def close(self, keep):
+        if keep:
+            self.report()
+        elif os.path.isdir(self.root):
+            try:
+                shutil.rmtree(self.root, onerror=remove_readonly_files_windows)
+            except OSError:
+                logger.error('Failed to remove photo folder: {}.'.format(self.root))
+
+    def report(self):
+        megabyte = 1024 * 1024
+        logger.info('Photo store: {} profile(s) kept, {:.1f} MB of {:.1f} MB (peak {:.1f} MB).'.format(
+            len(self.profiles), self.get_total_size() / megabyte, self.max_size / megabyte, self.peak_size / megabyte))
+        logger.info('Photo store: {} profile(s) deleted after being swiped, {} evicted ({:.1f} MB).'.format(
+            self.deleted_profiles, self.evicted_profiles, self.evicted_size / megabyte))
+
+
+# See https://docs.python.org/3/library/shutil.html#rmtree-example
+def remove_readonly_files_windows(func, path, _):
+    # Clear the readonly bit and reattempt the removal
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
@@ -1,19 +1,21 @@
 # -*- coding: utf-8 -*-
 try:
+    from collections import namedtuple
+    import hashlib
     import os.path
     import pathlib
+    from statistics import mean
     import sys
+    from time import perf_counter
 
     import cv2
     import dlib
     from logger import logger
     import numpy as np
-    from keras.applications.resnet50 import ResNet50
-    from keras.backend import clear_session
-    from keras.layers import Dense
-    from keras.models import Sequential
 
-    from resources.constants import TEMP_FOLDER
+    from inference_backends import create_backend, get_backend_model_path
+    from model_registry import get_model_registry
+    from resources.constants import DETECTION_SIZE, FACE_DETECTION_STRATEGY, INFERENCE_BACKEND, OUTPUT_FOLDER, TEMP_FOLDER
 except ModuleNotFoundError:
     print('Something went wrong while importing dependencies. Please, check the requirements file.')
     sys.exit(1)
@@ -21,19 +23,22 @@ except ModuleNotFoundError:
 parent_path = os.path.dirname(os.path.abspath(__file__))
 
 model_path = os.path.join(parent_path, 'beauty', 'model_human_face_detector.dat')
-cnn_face_detector = dlib.cnn_face_detection_model_v1(model_path)
 
-resnet = ResNet50(include_top=False, pooling='avg')
-model = Sequential()
-model.add(resnet)
-model.add(Dense(5, activation='softmax'))
-model.layers[0].trainable = False
+# Increase this value when the way the faces are detected or scored changes, so the cached predictions are not used anymore.
+PREDICTION_VERSION = 3
 
-weights_path = os.path.join(parent_path, 'beauty', 'model-ldl-resnet.h5')
-model.load_weights(weights_path)
+# Longest side of the image used by the detector when the first pass does not find any face, bigger photos are reduced to this size.
+MAX_DETECTION_SIZE = 1280
+
+# The HOG detector is much faster than the CNN detector but it misses more faces. In the cascade strategy, the faces found by the HOG
+# detector are only trusted when their score reaches the confident score. The candidates between the ambiguous score and the confident
+# score are considered ambiguous and, like when no face is found, the photo is checked again with the CNN detector.
+HOG_AMBIGUOUS_SCORE = -0.5
+HOG_CONFIDENT_SCORE = 0.5
+DETECTION_STRATEGIES = ['cnn', 'hog', 'cascade']
 
 samples_folder = os.path.join(parent_path, 'beauty', 'samples')
-output_folder = os.path.join(parent_path, TEMP_FOLDER, 'output')
+output_folder = os.path.join(parent_path, TEMP_FOLDER, OUTPUT_FOLDER)
 
 
 def score_mapping(model_score):
@@ -54,65 +59,311 @@ def score_mapping(model_score):
     return mapping_score
 
 
-def beauty_predict(path, details, image, show_result=False):
+# The same mapping as score_mapping for an array of scores. Between the points it is the same piecewise-linear function, below the first
+# point the first segment is extended and from 5 on the score is 0.
+MAPPING_MODEL_SCORES = np.array([1.0, 1.9, 2.8, 3.4, 4, 5])
+MAPPING_SCORES = np.array([2.5, 4, 5.5, 6.5, 8, 9])
+
+
+def score_mapping_array(model_scores):
+    model_scores = np.asarray(model_scores, dtype=np.float64)
+    mapping_scores = np.interp(model_scores, MAPPING_MODEL_SCORES, MAPPING_SCORES)
+
+    below_first_point = model_scores < MAPPING_MODEL_SCORES[0]
+    first_slope = (MAPPING_SCORES[1] - MAPPING_SCORES[0]) / (MAPPING_MODEL_SCORES[1] - MAPPING_MODEL_SCORES[0])
+    mapping_scores[below_first_point] = first_slope * (model_scores[below_first_point] - MAPPING_MODEL_SCORES[0]) + MAPPING_SCORES[0]
+    # Written as a negation so an invalid score (NaN) also gets 0, like in score_mapping.
+    mapping_scores[~(model_scores < MAPPING_MODEL_SCORES[-1])] = 0
+
+    return mapping_scores
+
+
+# The result of running the face detector over a photo. The boxes are (left, top, right, bottom) coordinates in the photo, the faces are
+# cropped from it, and the scale is the factor applied to the photo to get the image where the detector found them.
+FaceDetection = namedtuple('FaceDetection', ['image', 'scale', 'boxes'])
+
+
+def load_image(image_path):
+    try:
+        with open(image_path, 'rb') as image_file:
+            return decode_image(image_file.read())
+    except OSError:
+        return None
+
+
+# Decodes the downloaded bytes without writing them to disk. The buffer is wrapped without copying it and the photo is decoded in the same
+# BGR order that the detector and the beauty model use, so the same matrix is shared by both without any conversion. The photo is always
+# decoded at its own size, because the faces are cropped from it.
+def decode_image(image_data):
+    return cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+# The first pass of the detector uses a reduced copy of the photo, most faces are big enough to be found in it and the detector is much
+# faster. The photos smaller than the size are not changed.
+def reduce_for_detection(image_matrix, detection_size=DETECTION_SIZE):
+    longest_side = max(image_matrix.shape[0:2])
+    if longest_side <= detection_size:
+        return image_matrix, 1
+
+    scale = detection_size / longest_side
+    reduced_image_size = (int(image_matrix.shape[1] * scale), int(image_matrix.shape[0] * scale))
+    reduced_image = cv2.resize(image_matrix, reduced_image_size, interpolation=cv2.INTER_AREA)
+
+    return reduced_image, reduced_image_size[1] / image_matrix.shape[0]
+
+
+# The detector works better with photos of a certain size, so big photos are reduced and small photos are enlarged. It is used when the
+# first pass does not find any face, to find the smaller faces.
+def resize_for_detection(image_matrix):
+    if image_matrix.shape[0] > MAX_DETECTION_SIZE:
+        new_shape = (MAX_DETECTION_SIZE, image_matrix.shape[1] * MAX_DETECTION_SIZE / image_matrix.shape[0])
+    elif image_matrix.shape[1] > MAX_DETECTION_SIZE:
+        new_shape = (image_matrix.shape[0] * MAX_DETECTION_SIZE / image_matrix.shape[1], MAX_DETECTION_SIZE)
+    elif image_matrix.shape[0] < 640 or image_matrix.shape[1] < 640:
+        new_shape = (image_matrix.shape[0] * 2, image_matrix.shape[1] * 2)
+    else:
+        new_shape = image_matrix.shape[0:2]
+
+    resized_image_size = (int(new_shape[1]), int(new_shape[0]))
+    resized_image = cv2.resize(image_matrix, resized_image_size)
+    scale = resized_image_size[1] / image_matrix.shape[0]
+
+    return resized_image, scale
+
+
+# Converts the boxes found in an image with the given scale to coordinates in the photo.
+def scale_boxes(boxes, scale):
+    if scale == 1:
+        return list(boxes)
+
+    return [tuple(int(round(value / scale)) for value in box) for box in boxes]
+
+
+# Builds the detection of a photo whose faces were already found, for example in a previous execution.
+def rebuild_detection(image_matrix, scale, boxes):
+    return FaceDetection(image_matrix, scale, boxes)
+
+
+# Identifies the models in use without loading them, the name, size and modification date of their files are enough to notice a change.
+def get_model_version():
+    model_files = []
+    # The converted models do not give exactly the same scores as the original model, so the backend is also part of the version.
+    for path in [model_path, get_backend_model_path(INFERENCE_BACKEND)]:
+        if os.path.isfile(path):
+            file_stat = os.stat(path)
+            model_files.append('{}:{}:{}'.format(os.path.basename(path), file_stat.st_size, int(file_stat.st_mtime)))
+    model_files.append(str(PREDICTION_VERSION))
+    model_files.append(FACE_DETECTION_STRATEGY)
+    model_files.append(INFERENCE_BACKEND)
+    # The detection settings change which faces are found, so changing them also invalidates the cached predictions.
+    model_files.append('{}:{}:{}:{}'.format(DETECTION_SIZE, MAX_DETECTION_SIZE, HOG_AMBIGUOUS_SCORE, HOG_CONFIDENT_SCORE))
+
+    return hashlib.sha1(';'.join(model_files).encode('utf-8')).hexdigest()
+
+
+# If the faces of the photo have already been detected, the detection can be provided to avoid running the detector again.
+def beauty_predict(path, details, image, show_result=False, detection=None):
     logger.info('Predicting beauty. This process could take a while, be patient.'.format(image))
     punctuations = []
 
     image_path = os.path.join(path, details, image)
-    image_matrix = cv2.imread(image_path)
-
-    if image_matrix is not None:
-        if image_matrix.shape[0] > 1280:
-            new_shape = (1280, image_matrix.shape[1] * 1280 / image_matrix.shape[0])
-        elif image_matrix.shape[1] > 1280:
-            new_shape = (image_matrix.shape[0] * 1280 / image_matrix.shape[1], 1280)
-        elif image_matrix.shape[0] < 640 or image_matrix.shape[1] < 640:
-            new_shape = (image_matrix.shape[0] * 2, image_matrix.shape[1] * 2)
+    if detection is None:
+        image_matrix = load_image(image_path)
+        if image_matrix is None:
+            logger.warning('Cannot read photo {} for processing. Invalid path or format.'.format(image_path))
+            return punctuations
+        detection = detect_faces(image_matrix)
+
+    if len(detection.boxes) > 0:
+        punctuations = batch_beauty_predict([detection])[0]
+        for values, punctuation in zip(detection.boxes, punctuations):
+            logger.info('Score for photo {}: {:.2f}'.format(image, punctuation))
+            if show_result:
+                draw_result(values, detection.image, punctuation)
+
+        if show_result:
+            generate_output_result(details, image, detection.image)
+    else:
+        # If the face in the photo is too small because it is far the predictor cannot detect it.
+        logger.warning('Cannot calculate beauty score. The predictor could not detect the face in the photo.')
+
+    return punctuations
+
+
+# The predictor uses the face detectors and the beauty model of the model registry, which keeps them loaded for the whole execution of the
+# bot and shares them between every predictor of the process. Clearing the Keras session after every photo throws away the state of the
+# model, so every photo paid again the cost of preparing it. The models are loaded the first time they are used, so the executions that do
+# not predict anything do not pay for them.
+class BeautyPredictor:
+    OUTPUT_IMAGE_SIZE = (224, 224)
+
+    def __init__(self, backend=INFERENCE_BACKEND, threads=None):
+        self.backend = backend
+        self.threads = threads
+        self.first_call_time = None
+        self.steady_state_times = []
+
+    @staticmethod
+    def get_face_detector():
+        return get_model_registry().get(('cnn_face_detector', model_path), 'CNN face detector',
+                                        lambda: dlib.cnn_face_detection_model_v1(model_path))
+
+    @staticmethod
+    def get_hog_face_detector():
+        return get_model_registry().get(('hog_face_detector',), 'HOG face detector', dlib.get_frontal_face_detector)
+
+    def get_model(self):
+        return get_model_registry().get(('beauty_model', self.backend, self.threads), 'Beauty model ({} backend)'.format(self.backend),
+                                        lambda: create_backend(self.backend, self.threads))
+
+    # The image is only enlarged when the reduced image has no faces, which is the case of the photos without faces and the photos with
+    # small faces.
+    def detect_faces(self, image_matrix, strategy=FACE_DETECTION_STRATEGY, detection_size=DETECTION_SIZE):
+        reduced_image, scale = reduce_for_detection(image_matrix, detection_size)
+        boxes = self.find_faces(reduced_image, strategy)
+        if len(boxes) == 0:
+            resized_image, resized_scale = resize_for_detection(image_matrix)
+            if resized_image.shape != reduced_image.shape:
+                scale = resized_scale
+                boxes = self.find_faces(resized_image, strategy)
+
+        return FaceDetection(image_matrix, scale, scale_boxes(boxes, scale))
+
+    def find_faces(self, resized_image, strategy=FACE_DETECTION_STRATEGY):
+        if strategy == 'hog':
+            return self.run_hog_face_detector(resized_image, 0)[0]
+        elif strategy == 'cascade':
+            return self.run_cascade_face_detector(resized_image)
         else:
-            new_shape = image_matrix.shape[0:2]
-
-        resized_image_size = (int(new_shape[1]), int(new_shape[0]))
-        resized_image = cv2.resize(image_matrix, resized_image_size)
-        detected_faces = cnn_face_detector(resized_image, 0)
-
-        if len(detected_faces) > 0:
-            # The scores of the faces are stored from right to left order of their appearance in the photo.
-            for face in detected_faces:
-                values = [face.rect.left(), face.rect.top(), face.rect.right(), face.rect.bottom()]
-                cropped_face_image = resized_image[values[1]:values[3], values[0]:values[2], :]
-                output_image_size = (224, 224)
-                try:
-                    resized_face_image = cv2.resize(cropped_face_image, output_image_size)
-                    normed_image = np.array([(resized_face_image - 127.5) / 127.5])
+            return self.run_face_detector(resized_image)
+
+    def run_face_detector(self, resized_image):
+        detected_faces = self.get_face_detector()(resized_image, 0)
+
+        return [(face.rect.left(), face.rect.top(), face.rect.right(), face.rect.bottom()) for face in detected_faces]
 
-                    predictions = model.predict(normed_image)
-                    ld_list = predictions[0]
-                    output_value = 1 * ld_list[0] + 2 * ld_list[1] + 3 * ld_list[2] + 4 * ld_list[3] + 5 * ld_list[4]
+    # Returns the boxes of the faces whose score reaches the minimum score together with their scores.
+    def run_hog_face_detector(self, resized_image, minimum_score):
+        detected_faces, scores, _ = self.get_hog_face_detector().run(resized_image, 0, minimum_score)
+        boxes = [(face.left(), face.top(), face.right(), face.bottom()) for face in detected_faces]
 
-                    punctuation = score_mapping(output_value)
-                    punctuations.append(punctuation)
-                    logger.info('Score for photo {}: {:.2f}'.format(image, punctuation))
+        return boxes, list(scores)
 
-                    if show_result:
-                        draw_result(values, resized_image, punctuation)
+    # Most photos with a face are answered by the fast HOG detector, the slow CNN detector is only used when the HOG detector does not find
+    # any face or the faces it finds are not clear enough.
+    def run_cascade_face_detector(self, resized_image):
+        start = perf_counter()
+        hog_boxes, hog_scores = self.run_hog_face_detector(resized_image, HOG_AMBIGUOUS_SCORE)
+        hog_time = perf_counter() - start
+
+        if len(hog_scores) > 0 and max(hog_scores) >= HOG_CONFIDENT_SCORE:
+            logger.info('Cascade face detection: HOG found {} face(s) in {:.3f} s, CNN skipped.'.format(len(hog_boxes), hog_time))
+            return [box for box, score in zip(hog_boxes, hog_scores) if score >= 0]
+
+        start = perf_counter()
+        cnn_boxes = self.run_face_detector(resized_image)
+        cnn_time = perf_counter() - start
+        reason = 'ambiguous face(s)' if len(hog_boxes) > 0 else 'no face'
+        logger.info('Cascade face detection: HOG found {} in {:.3f} s, CNN found {} face(s) in {:.3f} s.'.format(reason, hog_time,
+                                                                                                              len(cnn_boxes), cnn_time))
+
+        return cnn_boxes
+
+    # Predicts the beauty of all the faces of several photos with a single call to the model, because the cost of each call is high
+    # compared to the cost of each face. The scores are returned grouped by photo in the same order as the detections, and the scores of
+    # each photo keep the order of its boxes.
+    def batch_beauty_predict(self, detections):
+        logger.info('Predicting beauty of {} photo(s) in a single batch.'.format(len(detections)))
+
+        normed_images, face_owners = self.prepare_faces(detections)
+        if len(face_owners) > 0:
+            predictions = self.run_model(normed_images)
+            if predictions is not None:
+                return self.map_scores(predictions, face_owners, len(detections))
+
+        return [[] for _ in detections]
+
+    # Crops the faces of the photos and puts them together in the normalized batch the model expects. The owners are the index of the
+    # photo each face belongs to. The faces are resized directly into a float32 batch that is normalized in place, so no temporary copy is
+    # made for each face.
+    def prepare_faces(self, detections):
+        number_of_faces = sum(len(detection.boxes) for detection in detections)
+        normed_images = np.empty((number_of_faces, *self.OUTPUT_IMAGE_SIZE[::-1], 3), dtype=np.float32)
+        face_owners = []
+        for photo_index, detection in enumerate(detections):
+            for values in detection.boxes:
+                cropped_face_image = detection.image[values[1]:values[3], values[0]:values[2], :]
+                try:
+                    normed_images[len(face_owners)] = cv2.resize(cropped_face_image, self.OUTPUT_IMAGE_SIZE)
+                    face_owners.append(photo_index)
                 except cv2.error:
-                    logger.error('OpenCV cannot resize the image {}, it can have a partial face.'.format(image_path))
+                    logger.error('OpenCV cannot resize the face of photo {}, it can have a partial face.'.format(photo_index + 1))
                     break
-                except ValueError:
-                    logger.error('Aborting the process, the chart data from the previous session could not be deleted.')
-                    clear_session()
 
-            if show_result:
-                generate_output_result(details, image, resized_image)
+        normed_images = normed_images[:len(face_owners)]
+        normed_images -= 127.5
+        normed_images /= 127.5
+
+        return normed_images, face_owners
+
+    # The expected value of each face is the dot product of its probabilities with the possible scores (1 to 5).
+    @staticmethod
+    def map_scores(predictions, face_owners, number_of_photos):
+        punctuations = [[] for _ in range(number_of_photos)]
+        if len(face_owners) == 0:
+            return punctuations
+
+        output_values = np.asarray(predictions, dtype=np.float64) @ np.arange(1, 6, dtype=np.float64)
+        for photo_index, mapping_score in zip(face_owners, score_mapping_array(output_values)):
+            punctuations[photo_index].append(float(mapping_score))
+
+        return punctuations
+
+    def run_model(self, normed_images):
+        model = self.get_model()
+        start = perf_counter()
+        predictions = model.predict(normed_images)
+        if predictions is None:
+            return None
+        self.record_latency(perf_counter() - start)
+
+        return predictions
+
+    def record_latency(self, elapsed_time):
+        # The first call includes the preparation of the model, so it is measured apart from the rest.
+        if self.first_call_time is None:
+            self.first_call_time = elapsed_time
         else:
-            # If the face in the photo is too small because it is far the predictor cannot detect it.
-            logger.warning('Cannot calculate beauty score. The predictor could not detect the face in the photo.')
-    else:
-        logger.warning('Cannot read photo {} for processing. Invalid path or format.'.format(image_path))
+            self.steady_state_times.append(elapsed_time)
 
-    clear_session()
+    def report_latency(self):
+        if self.first_call_time is None:
+            logger.info('The beauty model has not been used.')
+        elif len(self.steady_state_times) == 0:
+            logger.info('Beauty model latency. First call: {:.3f} s.'.format(self.first_call_time))
+        else:
+            logger.info('Beauty model latency. First call: {:.3f} s. Steady state: {:.3f} s on average over {} call(s).'.format(
+                self.first_call_time, mean(self.steady_state_times), len(self.steady_state_times)))
 
-    return punctuations
+
+predictor = None
+
+
+def get_predictor():
+    global predictor
+
+    if predictor is None:
+        predictor = BeautyPredictor()
+
+    return predictor
+
+
+def detect_faces(image_matrix):
+    return get_predictor().detect_faces(image_matrix)
+
+
+def batch_beauty_predict(detections):
+    return get_predictor().batch_beauty_predict(detections)
 
 
 # Show in a copy of the photo the detected faces and their respective score.
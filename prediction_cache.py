@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+try:
+    import hashlib
+    import json
+    import sqlite3
+    import sys
+    import threading
+    from time import time
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+def hash_image(image_data):
+    return hashlib.sha256(image_data).hexdigest()
+
+
+# Tinder shows the same photos again and again between executions, so the faces found in each photo and their scores are stored on disk.
+# The photos are identified by the hash of their content and the version of the models, so the results of older models are never used.
+# When the cache is full, the entries that have not been used for the longest time are removed.
+class PredictionCache:
+    CREATE_TABLE = 'CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, scale REAL NOT NULL, boxes TEXT NOT NULL, scores TEXT, ' \
+                   'last_access REAL NOT NULL)'
+    CREATE_INDEX = 'CREATE INDEX IF NOT EXISTS predictions_last_access ON predictions (last_access)'
+
+    def __init__(self, path, model_version, max_entries):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.detection_hits = 0
+        self.detection_misses = 0
+        self.score_hits = 0
+        self.score_misses = 0
+        # The cache can be used from the threads that download and analyze the photos.
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(self.CREATE_TABLE)
+        self.connection.execute(self.CREATE_INDEX)
+        self.connection.commit()
+
+    def get_key(self, image_hash):
+        return '{}:{}'.format(image_hash, self.model_version)
+
+    def get_entry(self, image_hash):
+        key = self.get_key(image_hash)
+        with self.lock:
+            row = self.connection.execute('SELECT scale, boxes, scores FROM predictions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('UPDATE predictions SET last_access = ? WHERE key = ?', (time(), key))
+            self.connection.commit()
+
+        scale, boxes, scores = row
+        boxes = [tuple(box) for box in json.loads(boxes)]
+        scores = None if scores is None else json.loads(scores)
+
+        return {'scale': scale, 'boxes': boxes, 'scores': scores}
+
+    # Returns the scale and the boxes of the faces found in the photo, or None if the photo has not been analyzed yet.
+    def get_detection(self, image_hash):
+        entry = self.get_entry(image_hash)
+        # The counters are also updated from several threads.
+        with self.lock:
+            if entry is None:
+                self.detection_misses += 1
+            else:
+                self.detection_hits += 1
+
+        return entry
+
+    # Returns the scores of the faces of the photo, or None if they have not been calculated yet.
+    def get_scores(self, image_hash):
+        entry = self.get_entry(image_hash)
+        scores = None if entry is None else entry['scores']
+        with self.lock:
+            if scores is None:
+                self.score_misses += 1
+            else:
+                self.score_hits += 1
+
+        return scores
+
+    def put_detection(self, image_hash, scale, boxes):
+        key = self.get_key(image_hash)
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO predictions (key, scale, boxes, scores, last_access) VALUES (?, ?, ?, NULL, ?)',
+                                    (key, scale, json.dumps([list(box) for box in boxes]), time()))
+            self.evict()
+            self.connection.commit()
+
+    def put_scores(self, image_hash, scores):
+        key = self.get_key(image_hash)
+        # The scores are NumPy values that cannot be serialized directly.
+        scores = json.dumps([float(score) for score in scores])
+        with self.lock:
+            self.connection.execute('UPDATE predictions SET scores = ?, last_access = ? WHERE key = ?', (scores, time(), key))
+            self.connection.commit()
+
+    def evict(self):
+        entries = self.connection.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+        if entries > self.max_entries:
+            self.connection.execute('DELETE FROM predictions WHERE key IN (SELECT key FROM predictions ORDER BY last_access LIMIT ?)',
+                                    (entries - self.max_entries,))
+            logger.info('Removed {} old entries from the prediction cache.'.format(entries - self.max_entries))
+
+    def report(self):
+        logger.info('Prediction cache. Detections: {} hit(s), {} miss(es). Scores: {} hit(s), {} miss(es).'.format(
+            self.detection_hits, self.detection_misses, self.score_hits, self.score_misses))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
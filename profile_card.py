@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+try:
+    import sys
+
+    from resources.firefox_xpaths import actual_photo_path, candidate_age_path, candidate_name_path, matched_profile_age_path
+    from resources.firefox_xpaths import matched_profile_name_path, matched_profile_one_photo_path, matched_profile_photo_path
+    from resources.firefox_xpaths import matched_profile_photos_selector, one_photo_path, photos_selector
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Every call to the WebDriver goes to the browser and back through geckodriver, and reading a profile card element by element took several
+# calls for the name, the age and each photo. The script reads the whole card in the browser and returns it with a single call. The URLs
+# of the photos are taken from their background image, the photos that Tinder has not loaded yet have no URL.
+PROFILE_CARD_SCRIPT = '''
+var xpaths = arguments[0];
+
+function find(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function getText(xpath) {
+    var node = find(xpath);
+    return node === null ? null : node.textContent.trim();
+}
+
+function getBackgroundUrl(xpath) {
+    var node = find(xpath);
+    if (node === null) {
+        return null;
+    }
+    var match = /url\\(["']?(.*?)["']?\\)/.exec(window.getComputedStyle(node).backgroundImage);
+    return match === null ? null : match[1];
+}
+
+var selector = find(xpaths.photos_selector);
+var photoButtons = selector === null ? 0 : selector.getElementsByTagName('button').length;
+var photoUrls = [];
+// Tinder starts the index at 1 instead of 0.
+for (var index = 1; index <= photoButtons; index++) {
+    photoUrls.push(getBackgroundUrl(xpaths.photo.replace('$index', index)));
+}
+
+return {
+    name: getText(xpaths.name),
+    age: getText(xpaths.age),
+    photo_buttons: photoButtons,
+    photo_urls: photoUrls,
+    one_photo_url: photoButtons === 0 ? getBackgroundUrl(xpaths.one_photo) : null
+};
+'''
+
+# The XPaths of the profiles shown to swipe and of the matching profiles. The XPath of the photo has the index of the photo as $index.
+CANDIDATE_CARD = {'name': candidate_name_path, 'age': candidate_age_path, 'photos_selector': photos_selector, 'photo': actual_photo_path,
+                  'one_photo': one_photo_path}
+MATCHED_CARD = {'name': matched_profile_name_path, 'age': matched_profile_age_path, 'photos_selector': matched_profile_photos_selector,
+                'photo': matched_profile_photo_path, 'one_photo': matched_profile_one_photo_path}
+
+
+# Returns the name and the age of the profile, the number of buttons to select the photos, the URLs of the photos of each button (None if
+# it has not been loaded) and, if there are no buttons, the URL of the only photo.
+def read_profile_card(driver, card_xpaths):
+    return driver.execute_script(PROFILE_CARD_SCRIPT, card_xpaths)
@@ -12,17 +12,74 @@ ARIA_LABEL_CHAT = 'Conversation history'
 LOG_MODE = 'production'
 
 THUMBNAIL_ORIGINAL_SIZE_MAPPING = {'/84x84_': '/640x640_', '/84x106_': '/640x800_'}
+# Smaller size of each original size of photo that is still enough to know whether there is a face in the photo. Only the photos with faces
+# are downloaded at the original size, to be scored. Leave empty to always download the original size.
+FACE_CHECK_SIZE_MAPPING = {'/640x640_': '/320x320_', '/640x800_': '/320x400_'}
 UNKNOWN_SUFFIX = 'unknown.jpg'
 
 WEBSITE_URL = 'https://tinder.com'
 
 TEMP_FOLDER = 'slipped_profiles'
+# Inside TEMP_FOLDER, copies of the photos with the detected faces and their scores.
+OUTPUT_FOLDER = 'output'
 MATCHED_FOLDER = 'matched_photos'
 # Deprecated
 GOLD_FOLDER = 'gold_matches'
 
 CRONTAB_BOT_COMMENT = 'Tinder bot.'
 
+# Folder of the Firefox profile of the bot, which keeps the session of Tinder and Facebook between executions so the login is only done when
+# the session is not valid anymore. Set to None to start every execution with a new profile.
+FIREFOX_PROFILE_FOLDER = 'firefox_profile'
+
+# Detector used to find the faces in the photos: 'cnn' (accurate but slow), 'hog' (fast but misses more faces) or 'cascade' (HOG first and
+# CNN only when HOG does not find a clear face).
+FACE_DETECTION_STRATEGY = 'cnn'
+
+# Longest side in pixels of the photos in the first pass of the face detector. Smaller is faster but misses more small faces, the photos
+# where no face is found are checked again enlarged.
+DETECTION_SIZE = 480
+
+# Library that runs the beauty model: 'keras' (the original model), 'tflite-float16', 'tflite-int8' or 'onnx'. The last three are faster
+# and use less memory on a CPU, their model is generated once with convert_model.py.
+INFERENCE_BACKEND = 'keras'
+
+# Number of photos of a profile that are downloaded in advance while the previous photos are analyzed.
+PHOTO_PREFETCH = 2
+
+# Download the photos of a profile in the background while the bot collects the rest of its photos, instead of after collecting all of
+# them. With the scoring daemon running, their faces are also detected and scored in the background. Maximum number of photos waiting
+# between two stages, a profile has at most 9 photos. Maximum seconds to wait for the stages when the profile ends, after that the photos
+# still being processed are not used.
+SWIPE_PIPELINE = True
+PIPELINE_QUEUE_SIZE = 9
+PIPELINE_FINISH_TIMEOUT = 120
+
+# Time limits in seconds to connect to the server and to receive data, number of retries of a failed download and the factor of the
+# increasing wait between retries.
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+# Maximum size in bytes of a downloaded photo.
+MAX_PHOTO_SIZE = 10 * 1024 * 1024
+
+# Stop scoring the photos of a profile once the decision of liking it cannot change: 'off', 'strict' (always the same decision as scoring
+# every photo) or 'fast' (also stops downloading photos, so the decision can differ in rare cases). With 'off' every photo of the profile is
+# scored with a single call to the model, the other modes need more calls to check the decision between them.
+EARLY_DECISION_MODE = 'off'
+
+# Unix socket of the scoring daemon, which keeps the models loaded between executions of the bot. When the daemon is not running, the bot
+# loads the models. Set to None to never use the daemon. Maximum time in seconds to wait for the answer of the daemon.
+SCORING_DAEMON_SOCKET = 'scoring_daemon.sock'
+SCORING_DAEMON_TIMEOUT = 60
+
+CACHE_FILE = 'prediction_cache.sqlite'
+CACHE_MAX_ENTRIES = 50000
+
+# State of the chat of each match, so the chats that did not change since the previous execution are not opened again.
+CONVERSATION_STATE_FILE = 'conversation_state.sqlite'
+
 #################################################
 #  MODIFY THIS CONSTANTS WITH YOUR INFORMATION  #
 #################################################
@@ -36,6 +93,10 @@ READ_TEXT_CHAT = 'Read'
 WAIT_MATCH_ANSWER = True
 # Set to True or False
 SILENT_MODE = True
+# Set to True or False
+SAVE_PROFILE_PHOTOS = False
+# Maximum size in bytes of the saved photos, the photos of the profiles swiped longest ago are deleted first.
+PHOTO_STORE_MAX_SIZE = 200 * 1024 * 1024
 
 # Fill the array with the possible messages to be sent by the bot. Phrases or words must be enclosed in double quotation marks (") and
 # separated by commas. Example: ["Hi there!", "How are you?"]
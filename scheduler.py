@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+try:
+    import os
+    import pathlib
+    import sys
+
+    from crontab import CronTab
+    from logger import logger
+
+    from resources.constants import CRONTAB_BOT_COMMENT
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+def check_crontab_entry(free_limit_reached):
+    logger.info('Checking Crontab for the next execution.')
+
+    script_directory = pathlib.Path(__file__).parent.absolute()
+    script_path = os.path.join(script_directory, 'crontab_script.sh')
+    command_text = 'bash {}'.format(script_path)
+    comment_text = CRONTAB_BOT_COMMENT
+
+    remove_crontab_entry(comment_text)
+    add_crontab_entry(command_text, comment_text, free_limit_reached)
+
+
+def remove_crontab_entry(comment_text=CRONTAB_BOT_COMMENT):
+    user_crontab = CronTab(user=True)
+    job = user_crontab.find_comment(comment_text)
+
+    if job:
+        user_crontab.remove(job)
+        user_crontab.write()
+        logger.info('Previous job entry in Crontab was removed.')
+    else:
+        logger.info('No previous job entry was found in Crontab.')
+
+
+def add_crontab_entry(command_text, comment_text, free_limit_reached):
+    user_crontab = CronTab(user=True)
+    job = user_crontab.new(command=command_text, comment=comment_text)
+
+    # The bot will wait in 2 different ways:
+    # 1 - If the bot closes because no more profiles are displayed, it will wait 1 hour to let Tinder refresh the profile list.
+    # 2 - If the bot closes because it has reached the free matches limit, it will wait 12 hours and 5 minutes before it starts again.
+    # Tinder has a cooldown time of 12 hours but I give 5 minutes of margin.
+    if free_limit_reached:
+        time_pattern = '5 */12 * * *'
+    else:
+        time_pattern = '0 * * * *'
+
+    job.setall(time_pattern)
+
+    if job.is_valid():
+        logger.info('Adding new job entry in Crontab.')
+        job.enable()
+        user_crontab.write()
+    else:
+        logger.warning('Invalid Crontab job entry, check the syntax.The bot will not execute automatically.')
@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+try:
+    import json
+    import os
+    import socket
+    import socketserver
+    import struct
+    import sys
+    import threading
+    from time import perf_counter
+
+    from logger import logger
+    from model_registry import get_model_registry
+    import numpy as np
+    from predict import BeautyPredictor, get_model_version, get_predictor
+
+    from resources.constants import FACE_DETECTION_STRATEGY, SCORING_DAEMON_SOCKET, SCORING_DAEMON_TIMEOUT
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# The bot is started again by Crontab every hour, and every execution had to load the face detector and the beauty model again before
+# scoring the first photo. The daemon keeps them loaded between executions and the bot sends it the photos through a Unix socket. If the
+# daemon is not running, or stops working, the bot loads the models and scores the photos by itself.
+
+parent_path = os.path.dirname(os.path.abspath(__file__))
+socket_path = None if not SCORING_DAEMON_SOCKET else os.path.join(parent_path, SCORING_DAEMON_SOCKET)
+
+# Each message is the length of a JSON header followed by the header and, if the header has a size, the bytes of an array.
+HEADER_LENGTH = struct.Struct('!I')
+
+
+def send_message(connection, header, payload=b''):
+    header = dict(header, size=len(payload))
+    encoded_header = json.dumps(header).encode('utf-8')
+    connection.sendall(HEADER_LENGTH.pack(len(encoded_header)) + encoded_header + payload)
+
+
+# Returns None when the other side closes the connection.
+def receive_message(connection):
+    length = receive_bytes(connection, HEADER_LENGTH.size)
+    encoded_header = None if length is None else receive_bytes(connection, HEADER_LENGTH.unpack(length)[0])
+    if encoded_header is None:
+        return None
+    header = json.loads(encoded_header.decode('utf-8'))
+    payload = receive_bytes(connection, header['size'])
+    if payload is None:
+        return None
+
+    return header, payload
+
+
+def receive_bytes(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+
+    return bytes(data)
+
+
+def encode_array(array):
+    return {'shape': list(array.shape), 'dtype': str(array.dtype)}, np.ascontiguousarray(array).tobytes()
+
+
+def decode_array(header, payload):
+    return np.frombuffer(payload, dtype=header['dtype']).reshape(header['shape'])
+
+
+class ScoringRequestHandler(socketserver.BaseRequestHandler):
+
+    # The bot keeps the connection open during the whole execution.
+    def handle(self):
+        while True:
+            message = receive_message(self.request)
+            if message is None:
+                break
+            header, payload = message
+            start = perf_counter()
+            try:
+                response = self.server.process(header, payload)
+            except Exception as error:
+                logger.exception('The daemon could not process the {} request.'.format(header.get('command')))
+                response = {'error': str(error)}, b''
+            send_message(self.request, *response)
+            logger.debug('Processed the {} request in {:.3f} s.'.format(header.get('command'), perf_counter() - start))
+
+
+# Each connection has its own thread, so a bot that does not close its connection does not block the next executions. The models are used
+# by one request at a time.
+class ScoringServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, predictor):
+        self.predictor = predictor
+        self.model_version = get_model_version()
+        self.lock = threading.Lock()
+        super().__init__(path, ScoringRequestHandler)
+
+    def process(self, header, payload):
+        with self.lock:
+            return self.process_command(header, payload)
+
+    def process_command(self, header, payload):
+        command = header.get('command')
+        if command == 'version':
+            return {'version': self.model_version}, b''
+        elif command == 'detect':
+            boxes = self.predictor.find_faces(decode_array(header, payload), header['strategy'])
+            return {'boxes': [list(box) for box in boxes]}, b''
+        elif command == 'predict':
+            predictions = self.predictor.run_model(decode_array(header, payload))
+            if predictions is None:
+                return {'error': 'The beauty model could not be recovered.'}, b''
+            return encode_array(np.asarray(predictions, dtype=np.float32))
+        else:
+            return {'error': 'Unknown command: {}.'.format(command)}, b''
+
+
+# Works like the predictor of the bot, but the faces are found and scored by the daemon. The photos are resized, the faces are cropped and
+# their scores are mapped by the bot, only the detector and the model run in the daemon.
+class RemotePredictor(BeautyPredictor):
+
+    def __init__(self, connection):
+        super().__init__()
+        self.connection = connection
+        self.lock = threading.Lock()
+
+    def request(self, header, payload=b''):
+        if self.connection is None:
+            return None
+
+        try:
+            with self.lock:
+                send_message(self.connection, header, payload)
+                message = receive_message(self.connection)
+            if message is None:
+                raise ConnectionError('The daemon closed the connection.')
+        except (OSError, ValueError) as error:
+            logger.warning('The scoring daemon stopped working ({}), scoring the photos in the bot from now on.'.format(error))
+            self.close()
+            return None
+
+        header, payload = message
+        if 'error' in header:
+            logger.warning('The scoring daemon could not process the request: {}. Scoring the photo in the bot.'.format(header['error']))
+            return None
+
+        return header, payload
+
+    def find_faces(self, resized_image, strategy=FACE_DETECTION_STRATEGY):
+        header, payload = encode_array(resized_image)
+        response = self.request(dict(header, command='detect', strategy=strategy), payload)
+        if response is None:
+            return super().find_faces(resized_image, strategy)
+
+        return [tuple(box) for box in response[0]['boxes']]
+
+    def run_model(self, normed_images):
+        start = perf_counter()
+        header, payload = encode_array(normed_images)
+        response = self.request(dict(header, command='predict'), payload)
+        if response is None:
+            return super().run_model(normed_images)
+        self.record_latency(perf_counter() - start)
+
+        return decode_array(*response)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def connect(path, timeout):
+    if path is None or not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        return None
+
+    return connection
+
+
+# Returns the predictor of the daemon if it is running with the same models as the bot, otherwise the predictor of the bot.
+def connect_predictor():
+    connection = connect(socket_path, SCORING_DAEMON_TIMEOUT)
+    if connection is None:
+        logger.info('The scoring daemon is not running, the models are loaded in the bot.')
+        return get_predictor()
+
+    remote_predictor = RemotePredictor(connection)
+    response = remote_predictor.request({'command': 'version'})
+    if response is None:
+        return get_predictor()
+    if response[0]['version'] != get_model_version():
+        logger.warning('The scoring daemon uses different models than the bot, restart it. The models are loaded in the bot.')
+        remote_predictor.close()
+        return get_predictor()
+
+    logger.info('Connected to the scoring daemon.')
+    return remote_predictor
+
+
+def serve():
+    if socket_path is None or not hasattr(socket, 'AF_UNIX'):
+        logger.error('The scoring daemon needs a Unix socket, set the constant SCORING_DAEMON_SOCKET.')
+        return 1
+
+    if os.path.exists(socket_path):
+        connection = connect(socket_path, SCORING_DAEMON_TIMEOUT)
+        if connection is not None:
+            connection.close()
+            logger.error('The scoring daemon is already running on: {}.'.format(socket_path))
+            return 1
+        # Left by a daemon that did not stop properly.
+        os.remove(socket_path)
+
+    # The models are loaded and the model is called once before accepting connections, so the first photo of the bot is scored at once.
+    start = perf_counter()
+    predictor = get_predictor()
+    predictor.get_face_detector()
+    predictor.run_model(np.zeros((1, 224, 224, 3), dtype=np.float32))
+    logger.info('Scoring daemon models loaded in {:.2f} s.'.format(perf_counter() - start))
+    get_model_registry().report()
+
+    server = ScoringServer(socket_path, predictor)
+    # Only the user that runs the daemon can send it photos.
+    os.chmod(socket_path, 0o600)
+    logger.info('Scoring daemon listening on: {}.'.format(socket_path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('Stopping the scoring daemon.')
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+
+    return 0
+
+
+if __name__ == "__main__":  # Execute only if run as a script
+    sys.exit(serve())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+try:
+    import queue
+    import sys
+    import threading
+    from time import perf_counter
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+# Marks the end of the photos of the profile, each stage passes it to the next one when it has processed every photo before it.
+END_OF_PROFILE = None
+
+
+# Processes the items of its input queue one by one in its own thread and puts the result, if any, in its output queue. The idle time is
+# the time spent waiting for the previous stage.
+class PipelineStage(threading.Thread):
+
+    def __init__(self, name, process, input_queue, output_queue, cancelled):
+        super().__init__(name='{}-stage'.format(name), daemon=True)
+        self.stage_name = name
+        self.process = process
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.cancelled = cancelled
+        self.processed_items = 0
+        self.busy_time = 0.0
+        self.idle_time = 0.0
+        self.max_queue_depth = 0
+
+    # A stage that stops because of an error that is not an Exception, for example when the model cannot be loaded, cancels the profile and
+    # keeps reading its input queue, so the other stages are not blocked on it and the end of the profile always reaches the next stage.
+    def run(self):
+        try:
+            self.process_items()
+        except BaseException:
+            logger.exception('The {} stage stopped, the rest of photos of the profile are not processed.'.format(self.stage_name))
+            self.cancelled.set()
+            while self.input_queue.get() is not END_OF_PROFILE:
+                pass
+        finally:
+            self.output_queue.put(END_OF_PROFILE)
+
+    def process_items(self):
+        while True:
+            wait_start = perf_counter()
+            item = self.input_queue.get()
+            self.idle_time += perf_counter() - wait_start
+            if item is END_OF_PROFILE:
+                break
+            self.max_queue_depth = max(self.max_queue_depth, self.input_queue.qsize() + 1)
+
+            start = perf_counter()
+            result = None
+            if not self.cancelled.is_set():
+                try:
+                    result = self.process(item)
+                except Exception:
+                    logger.exception('The {} stage could not process the photo.'.format(self.stage_name))
+            self.busy_time += perf_counter() - start
+            self.processed_items += 1
+            if result is not None:
+                self.output_queue.put(result)
+
+
+# The stages of the analysis of the photos of a profile, connected by bounded queues. The bot adds the URL of each photo as soon as it has
+# it, so the photos are downloaded, their faces detected and scored while the bot waits between its actions on the website. Each stage
+# runs in its own thread and processes the photos in the order they were added.
+class ProfilePipeline:
+
+    def __init__(self, stages, queue_size, finish_timeout):
+        self.cancelled = threading.Event()
+        self.finish_timeout = finish_timeout
+        self.input_queue = queue.Queue(maxsize=queue_size)
+        self.stages = []
+        input_queue = self.input_queue
+        for index, (name, process) in enumerate(stages):
+            # The results are read when the profile ends, so the last queue cannot be bounded.
+            output_queue = queue.Queue() if index == len(stages) - 1 else queue.Queue(maxsize=queue_size)
+            self.stages.append(PipelineStage(name, process, input_queue, output_queue, cancelled=self.cancelled))
+            input_queue = output_queue
+        self.output_queue = input_queue
+
+        for stage in self.stages:
+            stage.start()
+
+    def add(self, item):
+        self.input_queue.put(item)
+
+    # Waits until every stage has processed the photos added and returns the results of the last stage. If the stages do not finish in
+    # time, the profile is cancelled and only the results received until then are returned.
+    def finish(self):
+        deadline = perf_counter() + self.finish_timeout
+        results = []
+        try:
+            self.input_queue.put(END_OF_PROFILE, timeout=self.finish_timeout)
+            while True:
+                result = self.output_queue.get(timeout=max(0.0, deadline - perf_counter()))
+                if result is END_OF_PROFILE:
+                    break
+                results.append(result)
+        except (queue.Empty, queue.Full):
+            logger.warning('The pipeline did not finish the profile in {} s, using the {} photo(s) processed.'.format(self.finish_timeout,
+                                                                                                                 len(results)))
+            self.cancelled.set()
+            return results
+        for stage in self.stages:
+            stage.join(max(0.0, deadline - perf_counter()))
+
+        return results
+
+    # The photos already added are not processed anymore.
+    def cancel(self):
+        self.cancelled.set()
+        self.finish()
+
+    def report(self):
+        for stage in self.stages:
+            logger.info('Pipeline stage {}: {} photo(s), busy {:.2f} s, idle {:.2f} s, maximum queue depth {}.'.format(
+                stage.stage_name, stage.processed_items, stage.busy_time, stage.idle_time, stage.max_queue_depth))
+
+    def get_idle_times(self):
+        return {stage.stage_name: round(stage.idle_time, 3) for stage in self.stages}
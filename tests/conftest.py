@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pathlib
+import shutil
+import sys
+import threading
+from time import sleep
+
+import pytest
+
+FIXTURES_FOLDER = pathlib.Path(__file__).parent / 'fixtures'
+
+
+# The tests that use the browser are skipped when Selenium, Firefox or the GeckoDriver are not installed.
+@pytest.fixture(scope='session')
+def driver():
+    webdriver = pytest.importorskip('selenium.webdriver')
+    if shutil.which('geckodriver') is None:
+        pytest.skip('The GeckoDriver is needed to open the fixture pages.')
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.firefox.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    try:
+        firefox_driver = webdriver.Firefox(options=options)
+    except WebDriverException as error:
+        pytest.skip('Firefox could not be started: {}'.format(error))
+    yield firefox_driver
+    firefox_driver.quit()
+
+
+# Opens a page of the fixtures folder in the browser.
+@pytest.fixture
+def open_fixture(driver):
+    def open_page(name):
+        driver.get((FIXTURES_FOLDER / name).as_uri())
+
+    return open_page
+
+
+# Answers each path with its list of responses in order, the last response is repeated. Each response is a status code, a body and a
+# delay in seconds before answering. The paths without responses get a 404.
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        responses = self.server.routes.get(self.path)
+        if not responses:
+            self.send_error(404)
+            return
+        status, body, delay = responses.pop(0) if len(responses) > 1 else responses[0]
+        sleep(delay)
+        if status != 200:
+            self.send_error(status)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        if self.server.send_content_length:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+        # Without Content-Length, the end of the body is the end of the connection.
+        self.close_connection = not self.server.send_content_length
+
+    def log_message(self, *_):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FixtureRequestHandler)
+        self.routes = {}
+        self.requests = []
+        self.send_content_length = True
+
+    # The client closes the connection of the photos that are too big before reading them.
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def url(self, path):
+        return 'http://127.0.0.1:{}{}'.format(self.server_address[1], path)
+
+    def serve(self, path, body, status=200, delay=0):
+        self.routes.setdefault(path, []).append((status, body, delay))
+
+
+@pytest.fixture
+def http_server():
+    server = FixtureServer()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
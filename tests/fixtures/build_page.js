@@ -0,0 +1,27 @@
+// Builds the elements of an absolute XPath like /html/body/div[1]/div/span, adding the missing elements of each step, and returns the
+// last one. A step without index is the first element of its tag, which is the one that the XPath finds first.
+function buildPath(xpath) {
+    var node = document.documentElement;
+    xpath.split('/').slice(2).forEach(function (step) {
+        var match = /^(\w+)(?:\[(\d+)\])?$/.exec(step);
+        var tag = match[1];
+        var index = match[2] === undefined ? 1 : parseInt(match[2], 10);
+        var children = Array.prototype.filter.call(node.children, function (child) {
+            return child.tagName.toLowerCase() === tag;
+        });
+        while (children.length < index) {
+            children.push(node.appendChild(document.createElement(tag)));
+        }
+        node = children[index - 1];
+    });
+    return node;
+}
+
+function setPhoto(xpath, url) {
+    var photo = buildPath(xpath);
+    photo.style.width = '64px';
+    photo.style.height = '64px';
+    if (url !== null) {
+        photo.style.backgroundImage = 'url("' + url + '")';
+    }
+}
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import itertools
+from statistics import median
+
+import pytest
+
+from decision import FAST_MODE_FACES_PER_PHOTO, MedianDecision, PipelineDecision
+
+THRESHOLD = 5
+
+
+def get_full_decision(photos_scores):
+    scores = [score for photo_scores in photos_scores for score in photo_scores]
+
+    return len(scores) > 0 and median(scores) >= THRESHOLD
+
+
+# Scores the photos one by one and returns the decision when it is settled, as the strict mode does.
+def get_early_decision(photos_scores, photos_faces):
+    decision = MedianDecision(THRESHOLD, sum(photos_faces))
+    for photo_scores, faces in zip(photos_scores, photos_faces):
+        if decision.is_settled():
+            break
+        decision.add_scores(photo_scores, faces)
+    assert decision.is_settled()
+
+    return decision.get_bounds()[0] >= THRESHOLD
+
+
+# Scores the photos in chunks with just enough faces to be able to settle the decision, as predict_profile_scores does.
+def get_chunked_decision(photos_scores, photos_faces):
+    decision = MedianDecision(THRESHOLD, sum(photos_faces))
+    position = 0
+    while position < len(photos_scores) and not decision.is_settled():
+        faces_to_settle = decision.get_faces_to_settle()
+        chunk_faces = 0
+        while position < len(photos_scores) and (chunk_faces == 0 or chunk_faces < faces_to_settle):
+            decision.add_scores(photos_scores[position], photos_faces[position])
+            chunk_faces += photos_faces[position]
+            position += 1
+    assert decision.is_settled()
+
+    return decision.get_bounds()[0] >= THRESHOLD
+
+
+# Every combination of scores around the threshold, for odd and even numbers of photos with one or two faces.
+@pytest.mark.parametrize('number_of_photos', [1, 2, 3, 4, 5])
+def test_strict_matches_the_full_median(number_of_photos):
+    for photos_scores in itertools.product([[2], [THRESHOLD], [8], [4, 6], [THRESHOLD, 9]], repeat=number_of_photos):
+        photos_faces = [len(photo_scores) for photo_scores in photos_scores]
+
+        assert get_early_decision(photos_scores, photos_faces) == get_full_decision(photos_scores)
+        assert get_chunked_decision(photos_scores, photos_faces) == get_full_decision(photos_scores)
+
+
+# The faces of a photo whose scores are missing were pending, so the median of the scores that were calculated is still between the
+# bounds.
+@pytest.mark.parametrize('photos_scores, photos_faces', [
+    ([[8], [], [8]], [1, 1, 1]),
+    ([[2], [], [8], [2]], [1, 2, 1, 1]),
+    ([[], [8], [4]], [1, 1, 1]),
+    ([[], []], [1, 1])
+])
+def test_strict_matches_the_full_median_with_missing_scores(photos_scores, photos_faces):
+    assert get_early_decision(photos_scores, photos_faces) == get_full_decision(photos_scores)
+    assert get_chunked_decision(photos_scores, photos_faces) == get_full_decision(photos_scores)
+
+
+def test_no_decision_is_settled_before_enough_faces_are_scored():
+    decision = MedianDecision(THRESHOLD, 5)
+
+    assert decision.get_faces_to_settle() == 3
+    decision.add_scores([8, 8], 2)
+    assert not decision.is_settled()
+    assert decision.get_faces_to_settle() == 1
+    decision.add_scores([8], 1)
+    assert decision.is_settled()
+
+
+# In the fast mode each photo counts as one pending face, whatever the number of faces it finally has.
+def test_fast_mode_expects_one_face_per_photo():
+    decision = PipelineDecision(THRESHOLD, 4, strict=False)
+    assert decision.pending_faces == 4 * FAST_MODE_FACES_PER_PHOTO
+
+    decision.add_photo_scores([8, 8, 8], 3)
+    assert decision.pending_faces == 3 * FAST_MODE_FACES_PER_PHOTO
+    decision.add_detection(0)
+    assert decision.pending_faces == 2 * FAST_MODE_FACES_PER_PHOTO
+    # Three high scores against two pending faces settle the decision in the fast mode, although the strict mode could not know it yet.
+    assert decision.skip_photo()
+
+
+# The strict mode does not settle while some photos are still being detected, because their faces could change the median.
+def test_pipeline_decision_waits_for_the_photos_in_flight():
+    decision = PipelineDecision(THRESHOLD, 3, strict=True)
+    decision.add_detection(1)
+    decision.add_photo_scores([8], 1)
+    decision.add_detection(1)
+    decision.add_photo_scores([8], 1)
+
+    assert decision.is_settled()
+    assert not decision.skip_photo()
+
+    # The last photo has three faces, so the two high scores are not enough anymore.
+    decision.add_detection(3)
+    assert not decision.skip_photo()
+    decision.add_photo_scores([2, 2, 2], 3)
+    assert decision.skip_photo()
+    assert decision.get_bounds()[0] < THRESHOLD
+
+
+def test_pipeline_decision_skips_once_every_photo_is_detected():
+    decision = PipelineDecision(THRESHOLD, 3, strict=True)
+    for _ in range(3):
+        decision.add_detection(1)
+    decision.add_photo_scores([8], 1)
+    decision.add_photo_scores([8], 1)
+
+    assert decision.skip_photo()
+    assert decision.skipped_photos == 1
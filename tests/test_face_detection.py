@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('dlib')
+import numpy as np
+from predict import BeautyPredictor, decode_image, HOG_AMBIGUOUS_SCORE, HOG_CONFIDENT_SCORE
+
+HOG_BOX = (10, 10, 50, 50)
+CNN_BOX = (12, 12, 52, 52)
+
+
+# Answers with the given faces instead of running the detectors, and records which detectors were run.
+class FixedDetectorPredictor(BeautyPredictor):
+
+    def __init__(self, hog_scores, cnn_boxes):
+        super().__init__()
+        self.hog_scores = hog_scores
+        self.cnn_boxes = cnn_boxes
+        self.detectors_run = []
+
+    def run_hog_face_detector(self, resized_image, minimum_score):
+        self.detectors_run.append('hog')
+        scores = [score for score in self.hog_scores if score >= minimum_score]
+
+        return [HOG_BOX] * len(scores), scores
+
+    def run_face_detector(self, resized_image):
+        self.detectors_run.append('cnn')
+
+        return list(self.cnn_boxes)
+
+
+IMAGE = np.zeros((100, 100, 3), dtype=np.uint8)
+
+
+def test_cascade_trusts_confident_hog_faces():
+    predictor = FixedDetectorPredictor([HOG_CONFIDENT_SCORE, HOG_AMBIGUOUS_SCORE], [CNN_BOX])
+
+    boxes = predictor.find_faces(IMAGE, 'cascade')
+
+    assert predictor.detectors_run == ['hog']
+    # The ambiguous candidate is not a face for the HOG detector alone.
+    assert boxes == [HOG_BOX]
+
+
+@pytest.mark.parametrize('hog_scores', [[], [HOG_AMBIGUOUS_SCORE], [HOG_CONFIDENT_SCORE - 0.1]])
+def test_cascade_checks_with_cnn(hog_scores):
+    predictor = FixedDetectorPredictor(hog_scores, [CNN_BOX])
+
+    boxes = predictor.find_faces(IMAGE, 'cascade')
+
+    assert predictor.detectors_run == ['hog', 'cnn']
+    assert boxes == [CNN_BOX]
+
+
+@pytest.mark.parametrize('strategy, detectors_run', [('cnn', ['cnn']), ('hog', ['hog'])])
+def test_single_detector_strategies(strategy, detectors_run):
+    predictor = FixedDetectorPredictor([HOG_CONFIDENT_SCORE], [CNN_BOX])
+
+    predictor.find_faces(IMAGE, strategy)
+
+    assert predictor.detectors_run == detectors_run
+
+
+# Finds a face only in the images whose longest side is at least the minimum size, in the middle of the image.
+class SizedFacePredictor(BeautyPredictor):
+
+    def __init__(self, minimum_size):
+        super().__init__()
+        self.minimum_size = minimum_size
+        self.searched_sizes = []
+
+    def find_faces(self, resized_image, strategy='cnn'):
+        height, width = resized_image.shape[0:2]
+        self.searched_sizes.append(max(height, width))
+        if max(height, width) < self.minimum_size:
+            return []
+
+        return [(width // 4, height // 4, width * 3 // 4, height * 3 // 4)]
+
+
+def test_face_found_in_the_reduced_photo():
+    image_matrix = np.zeros((800, 640, 3), dtype=np.uint8)
+    predictor = SizedFacePredictor(minimum_size=0)
+
+    detection = predictor.detect_faces(image_matrix, detection_size=400)
+
+    assert predictor.searched_sizes == [400]
+    # The faces are cropped from the photo, so the boxes are in its coordinates.
+    assert detection.image is image_matrix
+    assert detection.boxes == [(160, 200, 480, 600)]
+
+
+def test_photo_enlarged_when_no_face_is_found():
+    image_matrix = np.zeros((400, 320, 3), dtype=np.uint8)
+    predictor = SizedFacePredictor(minimum_size=500)
+
+    detection = predictor.detect_faces(image_matrix, detection_size=400)
+
+    assert predictor.searched_sizes == [400, 800]
+    assert detection.scale == 2
+    assert detection.boxes == [(80, 100, 240, 300)]
+
+
+# The benchmark measures the resize apart from the detector, with the same steps as detect_faces.
+@pytest.mark.parametrize('minimum_size', [0, 500, 5000])
+def test_benchmark_detection_matches_the_predictor(minimum_size):
+    from benchmark import measure_detection, StageTimes
+
+    image_matrix = np.zeros((400, 320, 3), dtype=np.uint8)
+    stage_times = StageTimes()
+
+    measured_detection = measure_detection(image_matrix, stage_times, SizedFacePredictor(minimum_size))
+    detection = SizedFacePredictor(minimum_size).detect_faces(image_matrix)
+
+    assert (measured_detection.scale, measured_detection.boxes) == (detection.scale, detection.boxes)
+    assert len(stage_times.times['resize']) == len(stage_times.times['detect']) > 0
+
+
+# The photos are decoded at their own size, even when they are much bigger than the size used by the detector.
+def test_big_photo_decoded_at_its_own_size():
+    image_matrix = np.random.RandomState(0).randint(0, 256, size=(3000, 2400, 3), dtype=np.uint8)
+
+    decoded_image = decode_image(cv2.imencode('.jpg', image_matrix)[1].tobytes())
+
+    assert decoded_image.shape == image_matrix.shape
+
+
+# The cached predictions depend on the detection settings, so changing any of them gives another version.
+@pytest.mark.parametrize('setting, value', [('DETECTION_SIZE', 640), ('MAX_DETECTION_SIZE', 1600), ('HOG_AMBIGUOUS_SCORE', -0.25),
+                                            ('HOG_CONFIDENT_SCORE', 0.75)])
+def test_detection_settings_change_the_model_version(monkeypatch, setting, value):
+    import predict
+
+    model_version = predict.get_model_version()
+    monkeypatch.setattr(predict, setting, value)
+
+    assert predict.get_model_version() != model_version
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+pytest.importorskip('requests')
+from http_client import get_face_check_url, HttpClient
+from resources.constants import MAX_PHOTO_SIZE
+
+PHOTO_PATH = '/640x800_photo.jpg'
+PHOTO = b'\xff\xd8' + b'0' * 1000
+
+
+@pytest.fixture
+def http_client():
+    http_client = HttpClient(5, 0.5, 2, 0, max_size=MAX_PHOTO_SIZE)
+    yield http_client
+    http_client.close()
+
+
+@pytest.mark.parametrize('photo_url, face_check_url', [
+    ('https://images-ssl.gotinder.com/1234/640x800_aaaa.jpg', 'https://images-ssl.gotinder.com/1234/320x400_aaaa.jpg'),
+    ('https://images-ssl.gotinder.com/1234/640x640_aaaa.jpg', 'https://images-ssl.gotinder.com/1234/320x320_aaaa.jpg'),
+    # The photos without a smaller size are checked at their own size.
+    ('https://images-ssl.gotinder.com/1234/172x216_aaaa.jpg', 'https://images-ssl.gotinder.com/1234/172x216_aaaa.jpg')
+])
+def test_face_check_url(photo_url, face_check_url):
+    assert get_face_check_url(photo_url) == face_check_url
+
+
+def test_downloads_the_photo(http_client, http_server):
+    http_server.serve(PHOTO_PATH, PHOTO)
+
+    assert http_client.get(http_server.url(PHOTO_PATH)) == PHOTO
+    assert http_client.bytes_transferred == len(PHOTO)
+    assert http_client.failed_requests == 0
+
+
+# The callers get None instead of an exception, they must check it before decoding the photo.
+def test_missing_photo_returns_none(http_client, http_server):
+    assert http_client.get(http_server.url(PHOTO_PATH)) is None
+    assert http_client.failed_requests == 1
+    # A 404 is not retried.
+    assert http_server.requests == [PHOTO_PATH]
+
+
+def test_unavailable_server_is_retried(http_client, http_server):
+    http_server.serve(PHOTO_PATH, b'', status=503)
+    http_server.serve(PHOTO_PATH, PHOTO)
+
+    assert http_client.get(http_server.url(PHOTO_PATH)) == PHOTO
+    assert http_server.requests == [PHOTO_PATH, PHOTO_PATH]
+    assert http_client.failed_requests == 0
+
+
+def test_unavailable_server_after_every_retry_returns_none(http_client, http_server):
+    http_server.serve(PHOTO_PATH, b'', status=503)
+
+    assert http_client.get(http_server.url(PHOTO_PATH)) is None
+    assert len(http_server.requests) == 3
+    assert http_client.failed_requests == 1
+
+
+# The server answers after the read timeout of the client.
+def test_slow_server_returns_none(http_server):
+    http_client = HttpClient(5, 0.2, 0, 0, max_size=MAX_PHOTO_SIZE)
+    http_server.serve(PHOTO_PATH, PHOTO, delay=1)
+
+    assert http_client.get(http_server.url(PHOTO_PATH)) is None
+    assert http_client.failed_requests == 1
+    http_client.close()
+
+
+@pytest.mark.parametrize('send_content_length', [True, False])
+def test_photo_bigger_than_the_maximum_size_returns_none(http_client, http_server, send_content_length):
+    http_server.send_content_length = send_content_length
+    http_server.serve(PHOTO_PATH, b'\xff\xd8' + b'0' * (MAX_PHOTO_SIZE - 1))
+
+    assert http_client.get(http_server.url(PHOTO_PATH)) is None
+    assert http_client.failed_requests == 1
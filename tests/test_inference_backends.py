@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from inference_backends import BACKENDS, create_backend, dequantize, get_backend_model_path, quantize
+
+INT8_DETAILS = {'quantization': (1 / 128, 0), 'dtype': np.int8}
+FLOAT32_DETAILS = {'quantization': (0.0, 0), 'dtype': np.float32}
+
+
+def test_every_backend_has_its_own_model():
+    model_paths = [get_backend_model_path(backend) for backend in BACKENDS]
+
+    assert BACKENDS[0] == 'keras'
+    assert len(set(model_paths)) == len(BACKENDS)
+
+
+def test_float32_is_not_quantized():
+    values = np.linspace(-1, 1, 11, dtype=np.float32)
+
+    assert quantize(values, FLOAT32_DETAILS) is values
+    assert dequantize(values, FLOAT32_DETAILS) is values
+
+
+def test_quantization_round_trip():
+    values = np.linspace(-1, 1 - 1 / 128, 9, dtype=np.float32)
+
+    quantized_values = quantize(values, INT8_DETAILS)
+
+    assert quantized_values.dtype == np.int8
+    assert np.allclose(dequantize(quantized_values, INT8_DETAILS), values, rtol=0, atol=1 / 256)
+
+
+# The values outside of the range of the integer type are clipped instead of wrapping around.
+def test_quantization_clips():
+    quantized_values = quantize(np.array([-2, 2], dtype=np.float32), INT8_DETAILS)
+
+    assert quantized_values.tolist() == [-128, 127]
+
+
+def test_unknown_backend_stops_the_bot():
+    with pytest.raises(SystemExit):
+        create_backend('unknown')
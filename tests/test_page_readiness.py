@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from time import perf_counter
+
+import pytest
+
+pytest.importorskip('selenium')
+from page_readiness import PageReadiness
+
+TARGET_XPATH = '//*[@id="target"]'
+TIMEOUT = 3
+
+
+@pytest.fixture
+def page_readiness(driver):
+    return PageReadiness(driver, TIMEOUT)
+
+
+def test_waits_until_inserted(driver, open_fixture, page_readiness):
+    open_fixture('readiness_inserted.html')
+
+    page_readiness.until_clickable(TARGET_XPATH)
+
+    assert driver.find_element_by_xpath(TARGET_XPATH).is_displayed()
+
+
+def test_waits_until_shown(driver, open_fixture, page_readiness):
+    open_fixture('readiness_shown.html')
+
+    page_readiness.until_clickable(TARGET_XPATH)
+
+    assert driver.find_element_by_xpath(TARGET_XPATH).is_displayed()
+
+
+def test_returns_background_image(open_fixture, page_readiness):
+    open_fixture('readiness_photo.html')
+
+    assert page_readiness.until_background_image(TARGET_XPATH) == 'https://images-ssl.gotinder.com/1234/640x800_aaaa.jpg'
+
+
+def test_present_without_waiting(open_fixture, page_readiness):
+    open_fixture('readiness_shown.html')
+
+    start = perf_counter()
+    page_readiness.until_present(TARGET_XPATH)
+
+    assert perf_counter() - start < TIMEOUT
+
+
+# Like WebDriverWait, the waits raise a TimeoutException when the element is not ready in time.
+def test_missing_element_times_out(open_fixture, page_readiness):
+    from selenium.common.exceptions import TimeoutException
+
+    open_fixture('readiness_missing.html')
+
+    start = perf_counter()
+    with pytest.raises(TimeoutException):
+        page_readiness.until_present(TARGET_XPATH, timeout=1)
+    assert perf_counter() - start < TIMEOUT
+
+
+# A wait longer than the default timeout must not be stopped by the script timeout of the WebDriver.
+def test_longer_timeout(open_fixture, page_readiness):
+    open_fixture('readiness_inserted.html')
+
+    page_readiness.until_clickable(TARGET_XPATH, timeout=TIMEOUT * 2)
+
+    assert page_readiness.script_timeout >= TIMEOUT * 2
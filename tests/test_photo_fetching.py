@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+pytest.importorskip('selenium')
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('dlib')
+import numpy as np
+
+from http_client import HttpClient
+from photo_store import PhotoStore
+from predict import FaceDetection
+from prediction_cache import PredictionCache
+from timing import StageTimer
+import tinder_bot
+from tinder_bot import TinderBot
+
+ORIGINAL_PATH = '/640x800_photo.jpg'
+FACE_CHECK_PATH = '/320x400_photo.jpg'
+
+
+def encode_photo(width, height):
+    image = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+# The bot is built without the browser, only with the parts used to fetch the photos.
+@pytest.fixture
+def bot(tmp_path):
+    bot = TinderBot.__new__(TinderBot)
+    bot.temporary_folder = str(tmp_path)
+    bot.timer = StageTimer()
+    bot.http_client = HttpClient(5, 5, 0, 0, max_size=10 * 1024 * 1024)
+    bot.photo_store = PhotoStore(str(tmp_path / 'photos'), str(tmp_path / 'results'), 10 * 1024 * 1024)
+    bot.original_photo_executor = ThreadPoolExecutor(1)
+    bot.initialization_lock = threading.Lock()
+    bot.prediction_cache = PredictionCache(str(tmp_path / 'cache.db'), 'test', 100)
+    yield bot
+    bot.original_photo_executor.shutdown()
+    bot.http_client.close()
+
+
+# The faces of the smaller size were found in a 320x400 image reduced by 1.2 for the detector.
+def get_detected_photo(bot, http_server):
+    fetched_photo, _ = bot.fetch_photo(http_server.url(ORIGINAL_PATH), 'profile')
+    fetched_photo['hash'] = 'photo'
+    fetched_photo['scored'] = False
+    fetched_photo['detection'] = FaceDetection(np.zeros((400, 320, 3), dtype=np.uint8), 1.2, [(40, 50, 120, 150)])
+    bot.prediction_cache.put_detection('photo', 1.2, [(40, 50, 120, 150)])
+
+    return fetched_photo
+
+
+def test_faces_are_checked_in_the_smaller_size(bot, http_server):
+    http_server.serve(ORIGINAL_PATH, encode_photo(640, 800))
+    http_server.serve(FACE_CHECK_PATH, encode_photo(320, 400))
+
+    fetched_photo, _ = bot.fetch_photo(http_server.url(ORIGINAL_PATH), 'profile')
+
+    assert fetched_photo['original_url'] == http_server.url(ORIGINAL_PATH)
+    assert not fetched_photo['original_size']
+    assert http_server.requests == [FACE_CHECK_PATH]
+
+
+def test_original_size_fetched_when_the_smaller_size_is_missing(bot, http_server):
+    http_server.serve(ORIGINAL_PATH, encode_photo(640, 800))
+
+    fetched_photo, _ = bot.fetch_photo(http_server.url(ORIGINAL_PATH), 'profile')
+
+    assert cv2.imdecode(np.frombuffer(fetched_photo['data'], np.uint8), cv2.IMREAD_COLOR).shape[:2] == (800, 640)
+    assert fetched_photo['original_url'] is None
+    assert fetched_photo['original_size']
+    assert http_server.requests == [FACE_CHECK_PATH, ORIGINAL_PATH]
+
+
+def test_faces_are_moved_to_the_original_size(bot, http_server):
+    http_server.serve(ORIGINAL_PATH, encode_photo(640, 800))
+    http_server.serve(FACE_CHECK_PATH, encode_photo(320, 400))
+    photo = get_detected_photo(bot, http_server)
+
+    bot.prefetch_original_photo(photo)
+    bot.load_original_photo(photo)
+
+    assert photo['detection'].image.shape[:2] == (800, 640)
+    assert photo['detection'].boxes == [(80, 100, 240, 300)]
+    assert photo['detection'].scale == pytest.approx(0.6)
+    assert photo['original_size']
+    bot.cache_scores(photo, [7.5])
+    assert bot.prediction_cache.get_scores('photo') == [7.5]
+
+
+# Without the original size, the faces are scored in the smaller size and their scores are not cached.
+def test_faces_stay_in_the_smaller_size_when_the_original_is_missing(bot, http_server):
+    http_server.serve(FACE_CHECK_PATH, encode_photo(320, 400))
+    photo = get_detected_photo(bot, http_server)
+    detection = photo['detection']
+
+    bot.prefetch_original_photo(photo)
+    bot.load_original_photo(photo)
+
+    assert photo['detection'] is detection
+    assert not photo['original_size']
+    bot.cache_scores(photo, [7.5])
+    assert bot.prediction_cache.get_scores('photo') is None
+
+
+def test_saved_photo_keeps_the_original_size(bot, http_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(tinder_bot, 'SAVE_PROFILE_PHOTOS', True)
+    http_server.serve(ORIGINAL_PATH, encode_photo(640, 800))
+    http_server.serve(FACE_CHECK_PATH, encode_photo(320, 400))
+
+    fetched_photo, _ = bot.fetch_photo(http_server.url(ORIGINAL_PATH), 'profile')
+
+    saved_photo = tmp_path / 'photos' / 'profile' / fetched_photo['image_name']
+    assert cv2.imread(str(saved_photo)).shape[:2] == (800, 640)
+    assert fetched_photo['original_size']
+    assert http_server.requests == [ORIGINAL_PATH]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from string import Template
+
+from profile_card import CANDIDATE_CARD, MATCHED_CARD, read_profile_card
+from resources.firefox_xpaths import matched_profile_photo_selector_button, photo_selector_button
+
+
+def test_candidate_card_with_photos(driver, open_fixture):
+    open_fixture('candidate_card.html')
+
+    profile_card = read_profile_card(driver, CANDIDATE_CARD)
+
+    assert profile_card == {'name': 'Alice', 'age': '27', 'photo_buttons': 3,
+                            'photo_urls': ['https://images-ssl.gotinder.com/1234/640x800_aaaa.jpg',
+                                           'https://images-ssl.gotinder.com/1234/640x800_bbbb.jpg', None],
+                            'one_photo_url': None}
+    # The bot clicks the buttons by their own XPath.
+    assert len(driver.find_elements_by_xpath(Template(photo_selector_button).substitute(index=3))) == 1
+
+
+def test_candidate_card_with_one_photo(driver, open_fixture):
+    open_fixture('candidate_card_one_photo.html')
+
+    profile_card = read_profile_card(driver, CANDIDATE_CARD)
+
+    assert profile_card == {'name': 'Bea', 'age': '31', 'photo_buttons': 0, 'photo_urls': [],
+                            'one_photo_url': 'https://images-ssl.gotinder.com/5678/640x640_cccc.jpg'}
+
+
+def test_matched_card(driver, open_fixture):
+    open_fixture('matched_card.html')
+
+    profile_card = read_profile_card(driver, MATCHED_CARD)
+
+    assert profile_card == {'name': 'Carla', 'age': '25', 'photo_buttons': 2,
+                            'photo_urls': ['https://images-ssl.gotinder.com/9012/640x800_dddd.jpg', None], 'one_photo_url': None}
+    assert len(driver.find_elements_by_xpath(Template(matched_profile_photo_selector_button).substitute(index=2))) == 1
+
+
+# The bot stops when the name or the age are not found, the XPaths need to be updated.
+def test_card_not_shown(driver, open_fixture):
+    open_fixture('matched_card.html')
+
+    profile_card = read_profile_card(driver, CANDIDATE_CARD)
+
+    assert profile_card['name'] is None and profile_card['age'] is None
+    assert profile_card['photo_buttons'] == 0
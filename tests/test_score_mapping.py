@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('dlib')
+import numpy as np
+from predict import BeautyPredictor, FaceDetection, score_mapping, score_mapping_array
+
+# The batched preprocessing and score mapping must give the same results as the original code, which normalized each face on its own and
+# mapped each score with score_mapping. The models are not needed, the predictions are generated.
+TOLERANCE = 1e-5
+
+
+def generate_predictions(number_of_faces):
+    logits = np.random.RandomState(0).normal(scale=3, size=(number_of_faces, 5))
+
+    return (np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_batched_mapping_matches_scalar():
+    predictions = generate_predictions(10000)
+
+    batched_scores = [scores[0] for scores in BeautyPredictor.map_scores(predictions, list(range(len(predictions))), len(predictions))]
+    scalar_scores = [score_mapping(1 * ld_list[0] + 2 * ld_list[1] + 3 * ld_list[2] + 4 * ld_list[3] + 5 * ld_list[4])
+                     for ld_list in predictions]
+
+    assert np.allclose(batched_scores, scalar_scores, rtol=0, atol=TOLERANCE)
+
+
+# The points of the mapping and values outside of it.
+@pytest.mark.parametrize('model_score', [0.5, 1.0, 1.9, 2.8, 3.4, 4, 4.999, 5, 5.5, float('nan')])
+def test_mapping_points(model_score):
+    assert score_mapping_array([model_score])[0] == pytest.approx(score_mapping(model_score), abs=TOLERANCE)
+
+
+def test_scores_grouped_by_photo():
+    predictions = generate_predictions(3)
+
+    punctuations = BeautyPredictor.map_scores(predictions, [0, 0, 2], 3)
+
+    assert [len(scores) for scores in punctuations] == [2, 0, 1]
+
+
+def test_normalization_matches_scalar():
+    image_matrix = np.random.RandomState(0).randint(0, 256, size=(400, 300, 3), dtype=np.uint8)
+    boxes = [(10, 20, 110, 140), (150, 100, 290, 260), (0, 0, 300, 400)]
+
+    normed_images, face_owners = BeautyPredictor().prepare_faces([FaceDetection(image_matrix, 1, boxes)])
+    scalar_images = np.array([(cv2.resize(image_matrix[top:bottom, left:right, :], BeautyPredictor.OUTPUT_IMAGE_SIZE) - 127.5) / 127.5
+                              for left, top, right, bottom in boxes])
+
+    assert face_owners == [0, 0, 0]
+    assert np.allclose(normed_images, scalar_images, rtol=0, atol=TOLERANCE)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+
+from swipe_pipeline import ProfilePipeline
+
+
+def test_pipeline_returns_the_results_in_order():
+    profile_pipeline = ProfilePipeline([('double', lambda item: item * 2), ('increment', lambda item: item + 1)], 2, 5)
+    for item in range(5):
+        profile_pipeline.add(item)
+
+    assert profile_pipeline.finish() == [1, 3, 5, 7, 9]
+
+
+# The photo that fails is dropped, the rest of photos are still processed.
+def test_pipeline_continues_after_an_exception():
+    def process(item):
+        if item == 1:
+            raise ValueError(item)
+        return item
+
+    profile_pipeline = ProfilePipeline([('fail', process)], 2, 5)
+    for item in range(3):
+        profile_pipeline.add(item)
+
+    assert profile_pipeline.finish() == [0, 2]
+
+
+# A stage that exits, like create_backend when the model is missing, cancels the profile without blocking the previous stages, although
+# they have more photos than fit in the queue.
+def test_pipeline_finishes_when_a_stage_exits():
+    def process(_):
+        sys.exit(1)
+
+    profile_pipeline = ProfilePipeline([('fetch', lambda item: item), ('score', process)], 1, 5)
+    for item in range(5):
+        profile_pipeline.add(item)
+
+    assert profile_pipeline.finish() == []
+    assert profile_pipeline.cancelled.is_set()
+    assert not any(stage.is_alive() for stage in profile_pipeline.stages)
+
+
+def test_pipeline_stops_waiting_after_the_timeout():
+    release = threading.Event()
+    profile_pipeline = ProfilePipeline([('slow', lambda item: release.wait() and item)], 2, 0.1)
+    profile_pipeline.add(1)
+
+    assert profile_pipeline.finish() == []
+    assert profile_pipeline.cancelled.is_set()
+    release.set()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+try:
+    from collections import OrderedDict
+    from contextlib import contextmanager
+    import json
+    import math
+    import sys
+    import threading
+    from time import perf_counter
+
+    from logger import logger
+except ModuleNotFoundError:
+    print('Something went wrong while importing dependencies. Please, check the requirements file.')
+    sys.exit(1)
+
+
+def percentile(values, percent):
+    # Nearest-rank method
+    ordered_values = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered_values)) - 1)
+
+    return ordered_values[index]
+
+
+def summarize(values, percentiles):
+    if len(values) == 0:
+        return {'count': 0}
+
+    summary = {'count': len(values), 'total': sum(values), 'mean': sum(values) / len(values)}
+    for percent in percentiles:
+        summary['p{}'.format(percent)] = percentile(values, percent)
+
+    return summary
+
+
+# Measures how long each stage of the bot takes. The time of every stage is added to the record of the profile being analyzed, which is
+# logged when the profile is swiped, and to the totals of the execution, which are logged when the bot closes. The spans can be nested, so
+# a stage inside another one is counted in both.
+class StageTimer:
+
+    def __init__(self):
+        self.durations = OrderedDict()
+        self.profile_record = None
+        # The stages of the swipe pipeline are measured from their own threads.
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_time = perf_counter() - start
+            with self.lock:
+                self.durations.setdefault(stage, []).append(elapsed_time)
+                if self.profile_record is not None:
+                    stages = self.profile_record['stages']
+                    stages[stage] = stages.get(stage, 0) + elapsed_time
+
+    def start_profile(self):
+        self.profile_record = {'stages': OrderedDict(), 'start': perf_counter()}
+
+    def annotate(self, **fields):
+        if self.profile_record is not None:
+            self.profile_record.update(fields)
+
+    def end_profile(self):
+        if self.profile_record is None:
+            return
+
+        record = self.profile_record
+        self.profile_record = None
+        record['total'] = round(perf_counter() - record.pop('start'), 3)
+        record['stages'] = OrderedDict((stage, round(elapsed_time, 3)) for stage, elapsed_time in record['stages'].items())
+        logger.info('Profile timing: {}'.format(json.dumps(record)))
+
+    def report(self):
+        if len(self.durations) == 0:
+            return
+
+        logger.info('Time spent on each stage:')
+        for stage, values in self.durations.items():
+            summary = summarize(values, [95])
+            logger.info('{}: {} time(s), total {:.2f} s, mean {:.3f} s, p95 {:.3f} s.'.format(stage, summary['count'], summary['total'],
+                                                                                              summary['mean'], summary['p95']))
@@ -1,23 +1,31 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 try:
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    import itertools
     import os
     import pathlib
     import re
-    import requests
     import secrets
     import shutil
-    import stat
     from statistics import median, StatisticsError
     import sys
-    from time import sleep
+    import threading
+    from time import perf_counter, sleep
 
+    from conversation_state import fingerprint_preview, read_chat_previews, SENT_ACTION, WAITING_ACTION
+    from decision import FAST_MODE_FACES_PER_PHOTO, MedianDecision, PipelineDecision
+    from http_client import get_face_check_url, HttpClient
     from logger import logger
-    from predict import beauty_predict
+    from model_registry import get_model_registry
+    from page_readiness import PageReadiness
+    from photo_store import PhotoStore, remove_readonly_files_windows
+    from profile_card import CANDIDATE_CARD, MATCHED_CARD, read_profile_card
     from string import Template
-    import face_recognition
+    from swipe_pipeline import ProfilePipeline
+    from timing import StageTimer
 
-    from crontab import CronTab
     from selenium import webdriver
     from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException, TimeoutException
     from selenium.common.exceptions import StaleElementReferenceException
@@ -26,22 +34,22 @@ try:
     from selenium.webdriver.support import expected_conditions as ec
     from selenium.webdriver.support.ui import WebDriverWait
 
-    from resources.constants import ARIA_LABEL_CHAT, BLURRED_ITEM_CLASS, BLURRED_PHOTO_CLASS, CRONTAB_BOT_COMMENT, DEFAULT_CHAT_MESSAGES
-    from resources.constants import EXPAND_BUTTON_TEXT, GOLD_FOLDER, MATCHED_FOLDER, PASSWORD, READ_TEXT_CHAT, SENT_TEXT_CHAT, SILENT_MODE
-    from resources.constants import SCORE_THRESHOLD, THUMBNAIL_ORIGINAL_SIZE_MAPPING, TEMP_FOLDER, UNKNOWN_SUFFIX, USERNAME
-    from resources.constants import WAIT_MATCH_ANSWER, WEBSITE_URL
-
-    from resources.firefox_xpaths import actual_photo_path, actual_video, blurry_list, buttons_panel
-    from resources.firefox_xpaths import candidate_age_path, candidate_name_path, cardboard, chat_text_area
-    from resources.firefox_xpaths import cookies_permission, dislike, email_input, get_tinder_plus, gold_popup
+    from resources.constants import ARIA_LABEL_CHAT, BLURRED_ITEM_CLASS, BLURRED_PHOTO_CLASS, CACHE_FILE, CACHE_MAX_ENTRIES
+    from resources.constants import CONVERSATION_STATE_FILE, CRONTAB_BOT_COMMENT, DEFAULT_CHAT_MESSAGES, EARLY_DECISION_MODE
+    from resources.constants import EXPAND_BUTTON_TEXT
+    from resources.constants import FIREFOX_PROFILE_FOLDER, GOLD_FOLDER, HTTP_BACKOFF_FACTOR, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+    from resources.constants import HTTP_RETRIES, MATCHED_FOLDER, MAX_PHOTO_SIZE, OUTPUT_FOLDER, PASSWORD, PHOTO_PREFETCH
+    from resources.constants import PHOTO_STORE_MAX_SIZE, PIPELINE_FINISH_TIMEOUT, PIPELINE_QUEUE_SIZE, READ_TEXT_CHAT, SAVE_PROFILE_PHOTOS
+    from resources.constants import SCORE_THRESHOLD, SENT_TEXT_CHAT, SILENT_MODE, SWIPE_PIPELINE, TEMP_FOLDER
+    from resources.constants import THUMBNAIL_ORIGINAL_SIZE_MAPPING, UNKNOWN_SUFFIX, USERNAME, WAIT_MATCH_ANSWER, WEBSITE_URL
+
+    from resources.firefox_xpaths import actual_video, blurry_list, buttons_panel, candidate_name_path, cardboard
+    from resources.firefox_xpaths import chat_text_area, cookies_permission, dislike, email_input, get_tinder_plus, gold_popup
     from resources.firefox_xpaths import grouped_matches, like, login, location_permission, login_with_facebook
-    from resources.firefox_xpaths import login_with_facebook_expanded, match_popup, matched_profiles_list
-    from resources.firefox_xpaths import matched_profile_age_path, matched_profile_name_path
-    from resources.firefox_xpaths import matched_profile_one_photo_path, matched_profile_photos_selector
-    from resources.firefox_xpaths import matched_profile_photo_path, matched_profile_photo_selector_button, matches_tab
-    from resources.firefox_xpaths import messages_tab, more_login_options, notification_permission, one_photo_path
-    from resources.firefox_xpaths import passport_popup, password_input, photos_selector, photo_selector_button
-    from resources.firefox_xpaths import send_chat_text_area
+    from resources.firefox_xpaths import login_with_facebook_expanded, match_popup, matched_profiles_list, matched_profile_name_path
+    from resources.firefox_xpaths import matched_profile_photos_selector, matched_profile_photo_selector_button, matches_tab
+    from resources.firefox_xpaths import messages_tab, more_login_options, notification_permission, passport_popup, password_input
+    from resources.firefox_xpaths import photos_selector, photo_selector_button, send_chat_text_area
 except ModuleNotFoundError:
     print('Something went wrong while importing dependencies. Please, check the requirements file.')
     sys.exit(1)
@@ -63,25 +71,59 @@ class TinderBot:
         pathlib.Path(self.matched_folder).mkdir(exist_ok=True)
         # Create temporary folder
         self.temporary_folder = os.path.join(parent_folder, TEMP_FOLDER)
-        pathlib.Path(self.temporary_folder).mkdir(exist_ok=True)
+        self.photo_store = PhotoStore(self.temporary_folder, os.path.join(self.temporary_folder, OUTPUT_FOLDER), PHOTO_STORE_MAX_SIZE)
 
         self.url = WEBSITE_URL
         self.free_limit_reached = False
         self.likes_counter = 0
         self.dislikes_counter = 0
-        self.options = self.configure_firefox_options()
+        self.skipped_photos_counter = 0
+        self.timer = StageTimer()
+        # The photos downloaded in advance use their own connection to the server.
+        self.http_client = HttpClient(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF_FACTOR, MAX_PHOTO_SIZE,
+                                      pool_size=2 * PHOTO_PREFETCH + 1)
+        # The original size of the photos with faces is downloaded while the rest of photos of the profile are analyzed.
+        self.original_photo_executor = ThreadPoolExecutor(max_workers=PHOTO_PREFETCH)
+        # The cookies and the local storage of Tinder and Facebook are kept between executions in a Firefox profile of the bot.
+        self.firefox_profile_folder = None
+        if FIREFOX_PROFILE_FOLDER:
+            self.firefox_profile_folder = os.path.join(parent_folder, FIREFOX_PROFILE_FOLDER)
+            # The profile has the session cookies, so only the user that runs the bot can read it.
+            pathlib.Path(self.firefox_profile_folder).mkdir(mode=0o700, exist_ok=True)
+            os.chmod(self.firefox_profile_folder, 0o700)
+        self.options = self.configure_firefox_options(self.firefox_profile_folder)
+        self.driver_start_time = None
         # We wait to start the driver and the browser instance until we check if the credentials are valid.
         self.driver = None
         self.web_driver_wait = None
+        self.page_readiness = None
+        # The beauty predictor is only needed to swipe, so it is not loaded until the first profile is analyzed.
+        self.predictor = None
+        self.prediction_cache = None
+        self.cache_file = os.path.join(parent_folder, CACHE_FILE)
+        self.conversation_state = None
+        self.conversation_state_file = os.path.join(parent_folder, CONVERSATION_STATE_FILE)
+        # The predictor and the cache can be first needed by any stage of the pipeline.
+        self.initialization_lock = threading.Lock()
+        # The stages that analyze the photos of the current profile while its photos are collected, whether they also detect the faces and
+        # score the photos and the decision of liking the profile followed by them.
+        self.profile_pipeline = None
+        self.pipeline_scores_photos = False
+        self.pipeline_decision = None
 
     @staticmethod
-    def configure_firefox_options():
+    def configure_firefox_options(profile_folder=None):
         logger.info('Setting Firefox preferences.')
 
         options = Options()
         # Run Firefox with no GUI
         if SILENT_MODE:
             options.add_argument('--headless')
+        # The profile is used in place. A profile given with FirefoxProfile is copied to a temporary folder, so the session is lost when the
+        # browser is closed.
+        if profile_folder is not None:
+            options.add_argument('-profile')
+            options.add_argument(profile_folder)
         # Allow all cookies
         options.set_preference('network.cookie.cookieBehavior', 0)
         # Sometimes Facebook login window fails because it says that cookies are not enabled
@@ -104,8 +146,10 @@ class TinderBot:
             if self.check_score_threshold():
                 # Here you can start the browser instance.
                 logger.info('Possible valid user constants detected. starting driver.')
+                self.driver_start_time = perf_counter()
                 self.driver = webdriver.Firefox(firefox_options=self.options)
                 self.web_driver_wait = WebDriverWait(self.driver, timeout=10, poll_frequency=1, ignored_exceptions=[])
+                self.page_readiness = PageReadiness(self.driver, timeout=10)
                 return True
             else:
                 return False
@@ -145,10 +189,37 @@ class TinderBot:
         else:
             return False
 
+    # With the Firefox profile of the bot, the whole login is only done when the session of the previous executions is not valid anymore.
     def login(self):
+        with self.timer.span('login'):
+            self.driver.get(self.url)
+            if self.firefox_profile_folder is not None and self.is_session_authenticated():
+                logger.info('Already logged on Tinder with the saved Firefox profile, skipping the login.')
+            else:
+                self.login_with_facebook()
+        logger.info('Bot ready to swipe in {:.2f} s since the browser was started.'.format(perf_counter() - self.driver_start_time))
+
+    # Tinder shows the tabs of the matches once the session is authenticated and the login options otherwise.
+    def is_session_authenticated(self):
+        logger.info('Checking the session saved in the Firefox profile.')
+
+        def find_session_state(driver):
+            if len(driver.find_elements_by_xpath(matches_tab)) > 0:
+                return 'authenticated'
+            elif len(driver.find_elements_by_xpath(more_login_options)) > 0 or len(driver.find_elements_by_xpath(login_with_facebook)) > 0:
+                return 'login'
+            else:
+                return None
+
+        try:
+            return self.web_driver_wait.until(find_session_state) == 'authenticated'
+        except TimeoutException:
+            logger.warning('Could not check the saved session, logging in.')
+            return False
+
+    def login_with_facebook(self):
         logger.info('Logging on Tinder via Facebook.')
 
-        self.driver.get(self.url)
         # Sometimes the Facebook login option is hidden in 'More options'. We need first to check if it is hidden and if it fails we know
         # that it is displayed.
         facebook_xpath = None
@@ -221,11 +292,12 @@ class TinderBot:
                 # This is related with Tinder showing the tutorial of how swipe cardboards with gestures. We need to wait until the tutorial
                 # ends and the cardboard is available to click. 5 seconds is not enough, the tutorial lasts about 6 seconds so I give a
                 # margin waiting for 8 seconds.
-                self.web_driver_wait.until(ec.element_to_be_clickable((By.XPATH, cardboard)))
+                self.page_readiness.until_clickable(cardboard)
                 cardboard_section = self.driver.find_elements_by_xpath(cardboard)
                 buttons_panel_section = self.driver.find_elements_by_xpath(buttons_panel)
 
                 if len(cardboard_section) > 0 and len(buttons_panel_section) > 0:  # Potential matches are shown.
+                    self.timer.start_profile()
                     # We need time so the cardboard loads and at least the first photo too.
                     self.simulate_human_response_time()
                     validation_results = self.detect_valid_profile()
@@ -242,6 +314,9 @@ class TinderBot:
                         except ElementClickInterceptedException:  # A wild pop-up appeared!
                             free_matches_limit_reached = self.find_popup_to_close()
                             logger.info('Free matches limit reached. Try again later.')
+                    # The photos of every profile are kept while the user wants to keep them, within the maximum size of the store.
+                    self.photo_store.finish_profile(keep=SAVE_PROFILE_PHOTOS)
+                    self.timer.end_profile()
             except TimeoutException:
                 logger.info('Search animation in progress or cookies error on login screen. Attempt {} of {}'.format(actual_attempt,
                                                                                                                      limit_of_attempts))
@@ -252,10 +327,20 @@ class TinderBot:
     def detect_valid_profile(self):
         logger.info('Detect if it is a valid profile.')
 
-        free_matches_limit_reached, profile_data = self.collect_profile_photos()
+        with self.timer.span('collect_profile_photos'):
+            free_matches_limit_reached, profile_data = self.collect_profile_photos()
+        self.timer.annotate(photos=len(profile_data['photos']))
+        profile_pipeline, self.profile_pipeline = self.profile_pipeline, None
+        if profile_pipeline is not None and (free_matches_limit_reached or len(profile_data['photos']) == 0):
+            profile_pipeline.cancel()
         if not free_matches_limit_reached:
             if len(profile_data['photos']) > 0:
-                valid_photos = self.detect_human_photos(profile_data)
+                with self.timer.span('detect_human_photos'):
+                    if profile_pipeline is not None:
+                        valid_photos = self.finish_profile_pipeline(profile_pipeline, profile_data)
+                    else:
+                        valid_photos = self.detect_human_photos(profile_data)
+                self.timer.annotate(valid_photos=len(valid_photos))
                 if len(valid_photos) > 0:
                     return {'limit_reached': free_matches_limit_reached, 'photos': valid_photos, 'valid': True}
                 else:
@@ -271,7 +356,6 @@ class TinderBot:
         profile_name = ''
         profile_age = ''
         photos = []
-        array_of_buttons = self.driver.find_elements_by_xpath(photos_selector)
         free_matches_limit_reached = False
 
         # After press Like and getting the pop-up of out of likes, the code does another iteration an tries to validate the same profile but
@@ -279,21 +363,27 @@ class TinderBot:
         try:
             # Although the selector is available shortly before the end of the tutorial, the name and age are not.
             self.web_driver_wait.until(ec.element_to_be_clickable((By.XPATH, candidate_name_path)))
-            profile_name = self.driver.find_element_by_xpath(candidate_name_path)
-            profile_age = self.driver.find_element_by_xpath(candidate_age_path)
-            if len(array_of_buttons) > 0:  # The profile has more than one photo, seems a valid profile.
+            profile_card = self.get_profile_card(CANDIDATE_CARD)
+            profile_name = profile_card['name']
+            profile_age = profile_card['age']
+            if SWIPE_PIPELINE:
+                number_of_photos = max(1, profile_card['photo_buttons'])
+                details = self.PHOTO_FOLDER_NAME.substitute(name=profile_name, age=profile_age, photos=number_of_photos)
+                self.profile_pipeline = self.start_profile_pipeline(details, number_of_photos)
+            if profile_card['photo_buttons'] > 0:  # The profile has more than one photo, seems a valid profile.
                 logger.info('Found a possible valid profile.')
-                # The list of photos is a <div> of <button>. The . at the beginning specifies to find all child nodes.
-                selector_of_photos = array_of_buttons[0]
-                photos_available = selector_of_photos.find_elements_by_xpath('.//button')
-                photos = self.loop_over_photos(photos_available, photo_selector_button, actual_photo_path)
+                # The list of photos is a <div> of <button>. The // specifies to find all child nodes.
+                photos_available = self.driver.find_elements_by_xpath(photos_selector + '//button')
+                photos = self.loop_over_photos(photos_available, photo_selector_button, CANDIDATE_CARD, profile_card['photo_urls'],
+                                               self.add_photo_to_pipeline)
             else:  # Only one photo, can be a non photo profile or a non personal photo.
                 self.simulate_human_response_time()
-                photo_url = self.get_profile_photo(one_photo_path)
+                photo_url = self.get_profile_photo(CANDIDATE_CARD, loaded_url=profile_card['one_photo_url'])
                 # This is the URL of the default photo if the user did not upload any photo.
                 # https://images-ssl.gotinder.com/0001unknown/640x640_pct_0_0_100_100_unknown.jpg
                 if not photo_url.endswith(UNKNOWN_SUFFIX):
                     photos.append(photo_url)
+                    self.add_photo_to_pipeline(photo_url)
                     logger.info('Unique photo URL: {}.'.format(photo_url))
                 else:
                     logger.info('Profile with no photo detected!')
@@ -309,11 +399,13 @@ class TinderBot:
         except TimeoutException:
             logger.warning('Timeout exception when collecting photos from matching profiles, there could be a network problem.')
 
-        profile_data = {'age': profile_age.text, 'name': profile_name.text, 'photos': photos}
+        profile_data = {'age': profile_age, 'name': profile_name, 'photos': photos}
 
         return free_matches_limit_reached, profile_data
 
-    def loop_over_photos(self, photos_available, photo_selector, selected_photo):
+    # Each photo is given to add_photo, if any, as soon as its URL is known. The loaded URLs are the URLs of the photos read with the
+    # profile card, None for the photos that had not been loaded yet.
+    def loop_over_photos(self, photos_available, photo_selector, card_xpaths, loaded_urls, add_photo=None):
         # Tinder loads the photos on the fly, you only get the actual photo. You never get access to all photos by default so I use the
         # index after click on the selector.
         photos = []
@@ -328,96 +420,341 @@ class TinderBot:
                 # We need time so the photo of the pressed button loads
                 self.simulate_human_response_time()
                 logger.info('Getting photo {}.'.format(photo_index))
-                photo_url = self.get_profile_photo(selected_photo, photo_index)
+                loaded_url = loaded_urls[photo_index - 1] if photo_index <= len(loaded_urls) else None
+                photo_url = self.get_profile_photo(card_xpaths, photo_index, loaded_url)
                 logger.info('Photo {} URL: {}.'.format(photo_index, photo_url))
                 photos.append(photo_url)
+                if add_photo is not None:
+                    add_photo(photo_url)
                 photo_index += 1
             except ElementClickInterceptedException:
                 logger.warning('Element obscured, it is possible that a profile has answered on the chat. Retrying.')
+            # A photo that does not load in time is skipped, the rest of photos of the profile are still collected.
+            except TimeoutException:
+                logger.warning('Photo {} was not loaded in time, skipping it.'.format(photo_index))
+                photo_index += 1
         return photos
 
-    def detect_human_photos(self, profile_data):
+    # The name, the age and the photos of the card are read with a single script, instead of a call to the WebDriver for each element.
+    def get_profile_card(self, card_xpaths):
+        with self.timer.span('read_profile_card'):
+            profile_card = read_profile_card(self.driver, card_xpaths)
+        if profile_card['name'] is None or profile_card['age'] is None:
+            raise NoSuchElementException('The name or the age of the profile card were not found.')
+
+        return profile_card
+
+    # The scoring daemon is used when it is running, so the models do not need to be loaded again in every execution.
+    def get_predictor(self):
+        with self.initialization_lock:
+            if self.predictor is None:
+                from scoring_daemon import connect_predictor
+
+                self.predictor = connect_predictor()
+
+        return self.predictor
+
+    def get_prediction_cache(self):
+        with self.initialization_lock:
+            if self.prediction_cache is None:
+                from predict import get_model_version
+                from prediction_cache import PredictionCache
+
+                self.prediction_cache = PredictionCache(self.cache_file, get_model_version(), CACHE_MAX_ENTRIES)
+
+        return self.prediction_cache
+
+    # The CNN face detector of dlib does not release the GIL, so detecting the faces in a thread of the bot would slow down the main thread
+    # and change the pace of the actions on the website. Only the scoring daemon detects and scores the photos in the pipeline.
+    def is_scoring_remotely(self):
+        from scoring_daemon import RemotePredictor
+
+        predictor = self.get_predictor()
+
+        return isinstance(predictor, RemotePredictor) and predictor.connection is not None
+
+    # The photos are downloaded in the background while the bot waits between the photos of the profile, the pace of the actions on the
+    # website does not change. With the scoring daemon their faces are also detected and scored in the background, and the photos are
+    # skipped once the decision cannot change anymore. Otherwise the downloaded photos are analyzed when the profile has been collected.
+    def start_profile_pipeline(self, details, number_of_photos):
+        photo_indexes = itertools.count(1)
+        self.pipeline_scores_photos = self.is_scoring_remotely()
+        self.pipeline_decision = None
+        if self.pipeline_scores_photos and EARLY_DECISION_MODE != 'off':
+            self.pipeline_decision = PipelineDecision(SCORE_THRESHOLD, number_of_photos, strict=EARLY_DECISION_MODE == 'strict')
+        decision = self.pipeline_decision
+
+        # The photos that could not be downloaded are also passed on, so the photos keep their index.
+        def fetch(photo_url):
+            index = next(photo_indexes)
+            if decision is not None and decision.skip_photo():
+                return None
+            fetched_photo, fetch_time = self.fetch_photo(photo_url, details)
+            logger.info('Photo {} downloaded in {:.2f} s.'.format(index, fetch_time))
+
+            return index, fetched_photo
+
+        def detect(indexed_photo):
+            index, fetched_photo = indexed_photo
+            if decision is not None and decision.skip_photo():
+                return None
+            valid_photo = fetched_photo is not None and self.analyze_photo(index, fetched_photo)
+            if decision is not None:
+                decision.add_detection(len(fetched_photo['detection'].boxes) if valid_photo else 0)
+            if not valid_photo:
+                return None
+            self.prefetch_original_photo(fetched_photo)
+
+            return fetched_photo
+
+        def score(photo):
+            if decision is not None and decision.skip_photo():
+                self.cancel_original_photo(photo)
+                return None
+            self.score_photo(photo)
+            if decision is not None:
+                decision.add_photo_scores(photo['punctuation'], len(photo['detection'].boxes))
+
+            return photo
+
+        if self.pipeline_scores_photos:
+            return ProfilePipeline([('fetch', fetch), ('detect', detect), ('score', score)], PIPELINE_QUEUE_SIZE, PIPELINE_FINISH_TIMEOUT)
+        else:
+            return ProfilePipeline([('fetch', fetch)], PIPELINE_QUEUE_SIZE, PIPELINE_FINISH_TIMEOUT)
+
+    def add_photo_to_pipeline(self, photo_url):
+        if self.profile_pipeline is not None:
+            self.profile_pipeline.add(photo_url)
+
+    def finish_profile_pipeline(self, profile_pipeline, profile_data):
+        results = profile_pipeline.finish()
+        profile_pipeline.report()
+        self.timer.annotate(pipeline_idle=profile_pipeline.get_idle_times())
+        if not self.pipeline_scores_photos:
+            return self.detect_human_photos(profile_data, results)
+
+        decision = self.pipeline_decision
+        if decision is not None and decision.skipped_photos > 0:
+            logger.info('The decision cannot change anymore, {} photo(s) skipped.'.format(decision.skipped_photos))
+            self.skipped_photos_counter += decision.skipped_photos
+            self.timer.annotate(skipped_photos=decision.skipped_photos)
+
+        return results
+
+    # The photos scored in a previous execution take their scores from the cache.
+    def score_photo(self, photo):
+        if photo['scored']:
+            photo['punctuation'] = self.get_prediction_cache().get_scores(photo['hash'])
+        if photo.get('punctuation') is None:
+            self.load_original_photo(photo)
+            with self.timer.span('score_photo'):
+                photo['punctuation'] = self.get_predictor().batch_beauty_predict([photo['detection']])[0]
+            self.cache_scores(photo, photo['punctuation'])
+
+        return photo
+
+    # The scores of a photo scored at the smaller size are not cached, so the original size is tried again in the next execution.
+    def cache_scores(self, photo, punctuation):
+        if photo['original_size']:
+            self.get_prediction_cache().put_scores(photo['hash'], punctuation)
+
+    # The photos are downloaded in the background while the faces of the previous photos are detected, so the network and the processor
+    # work at the same time. Only a few photos are downloaded in advance and the photos are analyzed in their order. The photos already
+    # downloaded by the pipeline are given as fetched photos, with their index.
+    def detect_human_photos(self, profile_data, fetched_photos=None):
         logger.info('Identifying human faces in profile photos. This process could take a while, be patient.')
 
-        valid_photos = []
         profile_age = profile_data['age']
         profile_name = profile_data['name']
         profile_photos = profile_data['photos']
 
+        if fetched_photos is not None:
+            return self.analyze_photos(fetched_photos, len(profile_photos))
+
         details = self.PHOTO_FOLDER_NAME.substitute(name=profile_name, age=profile_age, photos=len(profile_photos))
-        for index, photo in enumerate(profile_photos, start=1):
-            fetched_photo = self.load_image_from_url(self.temporary_folder, photo, details)
-            if fetched_photo is not None:
-                details = fetched_photo['details']
-                image_name = fetched_photo['image_name']
-                fetched_photo_path = os.path.join(self.temporary_folder, details, image_name)
-                image = face_recognition.load_image_file(fetched_photo_path)
-                face_locations = face_recognition.face_locations(image, number_of_times_to_upsample=0, model="cnn")
-                if len(face_locations) > 0:
-                    valid_photos.append(fetched_photo)
-                    logger.info('Found a human face on photo {}.'.format(index))
-                else:
-                    logger.info('No human face found on photo {}, discarding photo.'.format(index))
+        with ThreadPoolExecutor(max_workers=PHOTO_PREFETCH) as executor:
+            downloads = self.download_photos(executor, profile_photos, details)
+            valid_photos = self.analyze_photos(downloads, len(profile_photos))
+            # The downloads of the skipped photos are cancelled.
+            downloads.close()
+
+        return valid_photos
+
+    # The downloads that have not started are cancelled when the generator is closed.
+    def download_photos(self, executor, profile_photos, details):
+        pending_downloads = deque(executor.submit(self.fetch_photo, photo, details) for photo in profile_photos[:PHOTO_PREFETCH])
+        next_photo = len(pending_downloads)
+        try:
+            for index in range(1, len(profile_photos) + 1):
+                wait_start = perf_counter()
+                fetched_photo, fetch_time = pending_downloads.popleft().result()
+                wait_time = perf_counter() - wait_start
+                if next_photo < len(profile_photos):
+                    pending_downloads.append(executor.submit(self.fetch_photo, profile_photos[next_photo], details))
+                    next_photo += 1
+                logger.info('Photo {} downloaded in {:.2f} s, {:.2f} s of them while analyzing other photos.'.format(
+                    index, fetch_time, max(0.0, fetch_time - wait_time)))
+
+                yield index, fetched_photo
+        finally:
+            for pending_download in pending_downloads:
+                pending_download.cancel()
+
+    # In the fast mode the photos are scored as soon as their faces are detected, and the rest of photos are not analyzed once the decision
+    # cannot change. The number of faces of the photos not analyzed yet is unknown, so the decision can differ from the one taken after
+    # analyzing every photo.
+    def analyze_photos(self, fetched_photos, number_of_photos):
+        valid_photos = []
+        decision = None
+        if EARLY_DECISION_MODE == 'fast':
+            decision = MedianDecision(SCORE_THRESHOLD, number_of_photos * FAST_MODE_FACES_PER_PHOTO)
+
+        for index, fetched_photo in fetched_photos:
+            if fetched_photo is not None and self.analyze_photo(index, fetched_photo):
+                valid_photos.append(fetched_photo)
+                self.prefetch_original_photo(fetched_photo)
+                if decision is not None:
+                    fetched_photo['punctuation'] = self.predict_profile_scores([fetched_photo])[0]
+                    decision.add_scores(fetched_photo['punctuation'], FAST_MODE_FACES_PER_PHOTO)
+            elif decision is not None:
+                decision.add_scores([], FAST_MODE_FACES_PER_PHOTO)
+
+            if decision is not None and index < number_of_photos and decision.is_settled():
+                skipped_photos = number_of_photos - index
+                logger.info('The decision cannot change anymore, skipping the remaining {} photo(s).'.format(skipped_photos))
+                self.skipped_photos_counter += skipped_photos
+                self.timer.annotate(skipped_photos=skipped_photos)
+                break
 
         return valid_photos
 
+    # The faces are searched in a smaller size of the photo, the original size is only downloaded for the photos with faces. The photos kept
+    # with SAVE_PROFILE_PHOTOS are saved at their original size, so then the original size is always downloaded.
+    def fetch_photo(self, photo, details):
+        start = perf_counter()
+        face_check_url = photo if SAVE_PROFILE_PHOTOS else get_face_check_url(photo)
+        # The photos are decoded in memory, they are only written to disk when the user wants to keep them.
+        with self.timer.span('load_image_from_url'):
+            fetched_photo = self.load_image_from_url(self.temporary_folder, face_check_url, details, save=False)
+            if fetched_photo is None and face_check_url != photo:
+                logger.info('The smaller size of the photo is not available, fetching the original size.')
+                face_check_url = photo
+                fetched_photo = self.load_image_from_url(self.temporary_folder, photo, details, save=False)
+        if fetched_photo is not None:
+            fetched_photo['original_url'] = photo if face_check_url != photo else None
+            fetched_photo['original_size'] = face_check_url == photo
+        if fetched_photo is not None and SAVE_PROFILE_PHOTOS:
+            self.photo_store.save_photo(details, fetched_photo['image_name'], fetched_photo['data'])
+
+        return fetched_photo, perf_counter() - start
+
+    def analyze_photo(self, index, fetched_photo):
+        from predict import decode_image, rebuild_detection
+        from prediction_cache import hash_image
+
+        prediction_cache = self.get_prediction_cache()
+        image_hash = hash_image(fetched_photo['data'])
+        fetched_photo['hash'] = image_hash
+        cached_detection = prediction_cache.get_detection(image_hash)
+        if cached_detection is not None and len(cached_detection['boxes']) == 0:
+            logger.info('No human face found on photo {} in a previous execution, discarding photo.'.format(index))
+            return False
+
+        with self.timer.span('decode_image'):
+            image = decode_image(fetched_photo['data'])
+        if image is None:
+            logger.warning('Cannot decode photo {} for processing. Invalid format.'.format(fetched_photo['image_name']))
+            return False
+        # The detection is kept with the photo so the beauty predictor does not need to detect the faces again.
+        if cached_detection is not None:
+            detection = rebuild_detection(image, cached_detection['scale'], cached_detection['boxes'])
+        else:
+            with self.timer.span('face_detection'):
+                detection = self.get_predictor().detect_faces(image)
+            prediction_cache.put_detection(image_hash, detection.scale, detection.boxes)
+        if len(detection.boxes) > 0:
+            fetched_photo['detection'] = detection
+            fetched_photo['scored'] = cached_detection is not None and cached_detection['scores'] is not None
+            logger.info('Found a human face on photo {}.'.format(index))
+            return True
+        else:
+            logger.info('No human face found on photo {}, discarding photo.'.format(index))
+            return False
+
+    def prefetch_original_photo(self, fetched_photo):
+        # The photos scored in a previous execution do not need the original size.
+        if fetched_photo['original_url'] is not None and not fetched_photo['scored']:
+            fetched_photo['original_download'] = self.original_photo_executor.submit(self.http_client.get, fetched_photo['original_url'])
+
+    # The faces were found in the smaller size of the photo, their boxes are moved to the original size so the faces are cropped from it.
+    # If the original size cannot be downloaded, the faces are cropped from the smaller size and the photo is not marked as original size.
+    def load_original_photo(self, photo):
+        from predict import decode_image, rebuild_detection, scale_boxes
+
+        original_download = photo.pop('original_download', None)
+        if original_download is None:
+            return
+        with self.timer.span('load_original_photo'):
+            image_data = original_download.result()
+            image = None if image_data is None else decode_image(image_data)
+        if image is None:
+            logger.warning('Could not get the original size of photo {}, scoring the smaller size.'.format(photo['image_name']))
+            return
+
+        detection = photo['detection']
+        scale = detection.image.shape[1] / image.shape[1]
+        photo['detection'] = rebuild_detection(image, detection.scale * scale, scale_boxes(detection.boxes, scale))
+        photo['original_size'] = True
+
     @staticmethod
-    def load_image_from_url(storage_path, photo_url, details=None):
+    def cancel_original_photo(photo):
+        original_download = photo.pop('original_download', None)
+        if original_download is not None:
+            original_download.cancel()
+
+    def load_image_from_url(self, storage_path, photo_url, details=None, save=True):
         # Sometimes the URL fails to be retrieved so we handle that case here.
         if photo_url is not None and photo_url != 'none':
             logger.info('Fetching image from URL: {}.'.format(photo_url))
 
             image_name = photo_url.split('_')[1]
-            if details is None:
-                image_path = os.path.join(storage_path, image_name)
-            else:
-                image_folder = os.path.join(storage_path, details)
-                pathlib.Path(image_folder).mkdir(exist_ok=True)
-                image_path = os.path.join(image_folder, image_name)
-            try:
-                image_data = requests.get(photo_url)
-
-                if image_data.status_code == 200:
+            image_data = self.http_client.get(photo_url)
+            if image_data is not None:
+                if save:
+                    if details is None:
+                        image_path = os.path.join(storage_path, image_name)
+                    else:
+                        image_folder = os.path.join(storage_path, details)
+                        pathlib.Path(image_folder).mkdir(exist_ok=True)
+                        image_path = os.path.join(image_folder, image_name)
                     with open(image_path, 'wb') as file:
-                        file.write(image_data.content)
-                    return {'details': details, 'image_name': image_name}
-                else:
-                    logger.warning('Could not fetch image from URL: {}, skipping.'.format(photo_url))
-                    return None
-            except requests.exceptions.ConnectionError:
-                logger.warning('Max retries exceeded with photo {}. Temporary failure in name resolution'.format(photo_url))
+                        file.write(image_data)
+                return {'details': details, 'image_name': image_name, 'data': image_data}
+            else:
+                logger.warning('Could not fetch image from URL: {}, skipping.'.format(photo_url))
                 return None
         else:
             logger.warning('A URL for the current photo has not been provided. Skipping.'.format(photo_url))
             return None
 
-    @staticmethod
-    def simulate_human_response_time():
+    def simulate_human_response_time(self):
         list_of_seconds_to_wait = [1, 1.25, 1.5, 1.75, 2]
         time = secrets.choice(list_of_seconds_to_wait)
-        sleep(time)
-
-    def get_profile_photo(self, xpath, index=None):
-        if index is not None:
-            photo_locator = (By.XPATH, Template(xpath).substitute(index=index))
-            photo_xpath = Template(xpath).substitute(index=index)
+        with self.timer.span('simulate_human_response_time'):
+            sleep(time)
+
+    # Waits in the browser until the photo of the pressed button has been loaded and returns its URL. If the photo had already been loaded
+    # when the profile card was read, its URL is used without waiting.
+    def get_profile_photo(self, card_xpaths, index=None, loaded_url=None):
+        if loaded_url is not None:
+            return loaded_url
+        if index is None:
+            photo_xpath = card_xpaths['one_photo']
         else:
-            photo_locator = (By.XPATH, xpath)
-            photo_xpath = xpath
-
-        photo_url = None
-        try:
-            self.web_driver_wait.until(ec.element_to_be_clickable(photo_locator))
-            selected_photo = self.driver.find_element_by_xpath(photo_xpath)
-            css_property = selected_photo.value_of_css_property('background-image')
-            photo_url = css_property.strip('url(\"').strip('\")')
-        except NoSuchElementException:
-            logger.error(self.UPDATE_XPATH_STRING)
-            logger.error('Cannot perform photo recovery operation.')
-            self.remove_crontab_entry()
-            self.exit()
+            photo_xpath = Template(card_xpaths['photo']).substitute(index=index)
 
-        return photo_url
+        with self.timer.span('get_profile_photo'):
+            return self.page_readiness.until_background_image(photo_xpath)
 
     # I do not need to process the videos, but I did the method to learn how retrieve the videos.
     def get_profile_video(self, index=None):
@@ -445,25 +782,109 @@ class TinderBot:
     def simulate_human_match_selection(self, photos, is_valid):
         if is_valid:
             punctuations = []
-            for photo in photos:
-                details = photo['details']
-                image_name = photo['image_name']
-                punctuation = beauty_predict(self.temporary_folder, details, image_name)
+            with self.timer.span('beauty_predict'):
+                photos_punctuations = self.predict_profile_scores(photos)
+            for photo, punctuation in zip(photos, photos_punctuations):
+                for score in punctuation:
+                    logger.info('Score for photo {}: {:.2f}'.format(photo['image_name'], score))
                 punctuations.extend(punctuation)
+                if SAVE_PROFILE_PHOTOS:
+                    self.save_prediction_result(photo, punctuation)
             average_score = self.calculate_average_score(punctuations)
             if average_score < SCORE_THRESHOLD:
+                self.timer.annotate(decision='dislike', score=round(float(average_score), 2))
                 self.press_button(dislike)
                 self.dislikes_counter += 1
                 logger.info('Swiping left.')
             elif average_score >= SCORE_THRESHOLD:
+                self.timer.annotate(decision='like', score=round(float(average_score), 2))
                 self.press_button(like)
                 self.likes_counter += 1
                 logger.info('Swiping right.')
         else:
+            self.timer.annotate(decision='invalid')
             self.press_button(dislike)
             self.dislikes_counter += 1
             logger.info('Invalid profile. Swiping left.')
 
+    # The scores of the photos already analyzed in previous executions are taken from the cache. Without early decision, all the faces of
+    # the remaining photos are scored together and the model is called at most once per profile. With early decision, the remaining photos
+    # are scored one by one until the decision cannot change anymore, the photos that are not scored get an empty list of scores. In the
+    # strict mode the number of faces of every photo is known, so the decision is always the same as scoring every photo.
+    def predict_profile_scores(self, photos):
+        prediction_cache = self.get_prediction_cache()
+        photos_punctuations = []
+        for photo in photos:
+            punctuation = photo.get('punctuation')
+            if punctuation is None:
+                punctuation = prediction_cache.get_scores(photo['hash'])
+            photos_punctuations.append(punctuation)
+        pending_indexes = [index for index, punctuation in enumerate(photos_punctuations) if punctuation is None]
+
+        if len(pending_indexes) == 0:
+            return photos_punctuations
+
+        predictor = self.get_predictor()
+        if EARLY_DECISION_MODE == 'off' or len(pending_indexes) == 1:
+            for index in pending_indexes:
+                self.load_original_photo(photos[index])
+            pending_punctuations = predictor.batch_beauty_predict([photos[index]['detection'] for index in pending_indexes])
+            for index, punctuation in zip(pending_indexes, pending_punctuations):
+                photos_punctuations[index] = punctuation
+                self.cache_scores(photos[index], punctuation)
+        else:
+            pending_faces = sum(len(photos[index]['detection'].boxes) for index in pending_indexes)
+            decision = MedianDecision(SCORE_THRESHOLD, pending_faces)
+            for punctuation in photos_punctuations:
+                if punctuation is not None:
+                    decision.add_scores(punctuation, 0)
+            # The photos are scored in chunks with a single call to the model each, every chunk with just enough faces to be able to settle
+            # the decision, so most profiles are scored with one call and the decision is checked between chunks.
+            position = 0
+            while position < len(pending_indexes):
+                if decision.is_settled():
+                    skipped_photos = len(pending_indexes) - position
+                    logger.info('The decision cannot change anymore, skipping the beauty prediction of {} photo(s).'.format(skipped_photos))
+                    self.skipped_photos_counter += skipped_photos
+                    self.timer.annotate(skipped_photos=skipped_photos)
+                    for skipped_index in pending_indexes[position:]:
+                        self.cancel_original_photo(photos[skipped_index])
+                    break
+                chunk_indexes = self.get_scoring_chunk(photos, pending_indexes[position:], decision.get_faces_to_settle())
+                position += len(chunk_indexes)
+                for index in chunk_indexes:
+                    self.load_original_photo(photos[index])
+                chunk_punctuations = predictor.batch_beauty_predict([photos[index]['detection'] for index in chunk_indexes])
+                for index, punctuation in zip(chunk_indexes, chunk_punctuations):
+                    photos_punctuations[index] = punctuation
+                    self.cache_scores(photos[index], punctuation)
+                    decision.add_scores(punctuation, len(photos[index]['detection'].boxes))
+
+        return [[] if punctuation is None else punctuation for punctuation in photos_punctuations]
+
+    # Returns the first pending photos that together have the given number of faces, at least one photo.
+    @staticmethod
+    def get_scoring_chunk(photos, pending_indexes, faces_to_settle):
+        chunk_indexes = []
+        chunk_faces = 0
+        for index in pending_indexes:
+            chunk_indexes.append(index)
+            chunk_faces += len(photos[index]['detection'].boxes)
+            if chunk_faces >= faces_to_settle:
+                break
+
+        return chunk_indexes
+
+    # Saves a copy of the photo with the detected faces and their respective score.
+    @staticmethod
+    def save_prediction_result(photo, punctuation):
+        from predict import draw_result, generate_output_result
+
+        detection = photo['detection']
+        for values, score in zip(detection.boxes, punctuation):
+            draw_result(values, detection.image, score)
+        generate_output_result(photo['details'], photo['image_name'], detection.image)
+
     @staticmethod
     def calculate_average_score(punctuations):
         logger.info('Calculate the average score for the actual profile.')
@@ -482,9 +903,10 @@ class TinderBot:
     def press_button(self, xpath):
         try:
             locator = (By.XPATH, xpath)
-            self.web_driver_wait.until(ec.element_to_be_clickable(locator))
-            button = self.driver.find_element_by_xpath(xpath)
-            button.click()
+            with self.timer.span('press_button'):
+                self.web_driver_wait.until(ec.element_to_be_clickable(locator))
+                button = self.driver.find_element_by_xpath(xpath)
+                button.click()
         except NoSuchElementException:
             logger.error(self.UPDATE_XPATH_STRING)
             logger.error('Cannot perform press button operation.')
@@ -507,21 +929,18 @@ class TinderBot:
 
         return free_matches_limit_reached
 
+    # The saved photos are kept for the next executions when the user wants to keep them, otherwise the folder is removed as before.
+    def close_photo_store(self):
+        self.photo_store.close(keep=SAVE_PROFILE_PHOTOS)
+
     def remove_photo_folder(self, path):
         logger.info('Removing photo folder: {}.'.format(path))
 
         try:
-            shutil.rmtree(path, onerror=self.remove_readonly_files_windows)
+            shutil.rmtree(path, onerror=remove_readonly_files_windows)
         except OSError:
             logger.error('Failed remove photo on Windows, retrying.')
 
-    # See https://docs.python.org/3/library/shutil.html#rmtree-example
-    @staticmethod
-    def remove_readonly_files_windows(func, path, _):
-        # Clear the readonly bit and reattempt the removal
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def close_permission_popups(self):
         logger.info('Trying to close permission pop-ups.')
 
@@ -557,8 +976,7 @@ class TinderBot:
         logger.info('Switching to {} tab.'.format(name))
 
         try:
-            tab_locator = (By.XPATH, tab_xpath)
-            self.web_driver_wait.until(ec.element_to_be_clickable(tab_locator))
+            self.page_readiness.until_clickable(tab_xpath)
             tab_button = self.driver.find_element_by_xpath(tab_xpath)
             tab_button.click()
         except NoSuchElementException:
@@ -577,14 +995,25 @@ class TinderBot:
             match_list = self.driver.find_element_by_xpath(matched_profiles_list)
             # The list of matches is a <div> of <a> tags. The . at the beginning specifies to find all child nodes.
             profiles_chats = match_list.find_elements_by_xpath('.//a')
-            self.simulate_human_conversation(profiles_chats, skip_animation)
+            chat_previews = read_chat_previews(self.driver, matched_profiles_list)
+            self.simulate_human_conversation(profiles_chats, skip_animation, chat_previews)
         except NoSuchElementException:
             logger.error(self.UPDATE_XPATH_STRING)
             logger.error('Skipping sending messages to matching profiles.')
         except TimeoutException:
             logger.warning('Timeout exception when sending messages to matching profiles, there could be a network problem.')
 
-    def simulate_human_conversation(self, profiles_chats, skip_animation):
+    def get_conversation_state(self):
+        if self.conversation_state is None:
+            from conversation_state import ConversationState
+
+            self.conversation_state = ConversationState(self.conversation_state_file)
+
+        return self.conversation_state
+
+    # Waiting for the answer of a match, its chat is only opened when its preview in the list of matches has changed since the previous
+    # execution. Without waiting, a message is sent to every match as before.
+    def simulate_human_conversation(self, profiles_chats, skip_animation, chat_previews=None):
         logger.info('Send message to matching profiles.')
 
         name_locator = (By.XPATH, matched_profile_name_path)
@@ -598,7 +1027,15 @@ class TinderBot:
 
         if len(DEFAULT_CHAT_MESSAGES) > 0:
             try:
-                for profile_chat in profiles_chats:
+                if chat_previews is not None and len(chat_previews) != len(profiles_chats):
+                    chat_previews = None
+                for index, profile_chat in enumerate(profiles_chats):
+                    chat_link = None if chat_previews is None else chat_previews[index]['link']
+                    preview_fingerprint = None if chat_previews is None else fingerprint_preview(chat_previews[index]['preview'])
+                    if WAIT_MATCH_ANSWER and chat_link is not None:
+                        if self.get_conversation_state().is_waiting_unchanged(chat_link, preview_fingerprint):
+                            logger.info('The chat {} has not changed since it was checked, skipping it.'.format(chat_link))
+                            continue
                     self.simulate_human_response_time()
                     profile_chat.click()
                     self.web_driver_wait.until(ec.element_to_be_clickable(name_locator))
@@ -606,6 +1043,8 @@ class TinderBot:
                     if WAIT_MATCH_ANSWER:
                         has_answered = self.check_match_answered(profile_name)
                         if not has_answered:
+                            if chat_link is not None:
+                                self.get_conversation_state().update(chat_link, preview_fingerprint, WAITING_ACTION)
                             continue
                     self.web_driver_wait.until(ec.element_to_be_clickable(chat_locator))
                     text_area = self.driver.find_element_by_xpath(chat_text_area)
@@ -617,6 +1056,8 @@ class TinderBot:
                         send_text_area = self.driver.find_element_by_xpath(send_chat_text_area)
                         send_text_area.click()
                         logger.info('Message sent to {}: {}.'.format(profile_name, message))
+                        if chat_link is not None:
+                            self.get_conversation_state().update(chat_link, None, SENT_ACTION)
                     else:
                         logger.warning('Empty messages cannot be sent.')
             except NoSuchElementException:
@@ -670,23 +1111,21 @@ class TinderBot:
                     profile.click()
                     self.simulate_human_response_time()  # We need to allow time for photos to be loaded.
                     self.web_driver_wait.until(ec.element_to_be_clickable((By.XPATH, matched_profile_name_path)))
-                    profile_name = profile.find_element_by_xpath(matched_profile_name_path).text
-                    profile_age = profile.find_element_by_xpath(matched_profile_age_path).text
+                    profile_card = self.get_profile_card(MATCHED_CARD)
+                    profile_name = profile_card['name']
+                    profile_age = profile_card['age']
                     logger.info('Retrieving profile photos for match: {}.'.format(profile_name))
-                    array_of_buttons = self.driver.find_elements_by_xpath(matched_profile_photos_selector)
-                    if len(array_of_buttons) > 0:  # The profile has more than one photo.
-                        selector_of_photos = array_of_buttons[0]
-                        photos_available = selector_of_photos.find_elements_by_xpath('.//button')
+                    if profile_card['photo_buttons'] > 0:  # The profile has more than one photo.
+                        photos_available = self.driver.find_elements_by_xpath(matched_profile_photos_selector + '//button')
                         selector = matched_profile_photo_selector_button
-                        selected_photo = matched_profile_photo_path
-                        photos = self.loop_over_photos(photos_available, selector, selected_photo)
+                        photos = self.loop_over_photos(photos_available, selector, MATCHED_CARD, profile_card['photo_urls'])
                         details = self.PHOTO_FOLDER_NAME.substitute(name=profile_name, age=profile_age, photos=len(photos))
                         for photo in photos:
                             self.simulate_human_response_time()
                             self.load_image_from_url(self.matched_folder, photo, details)
                     else:  # The profile has only one photo.
                         self.simulate_human_response_time()
-                        photo_url = self.get_profile_photo(matched_profile_one_photo_path)
+                        photo_url = self.get_profile_photo(MATCHED_CARD, loaded_url=profile_card['one_photo_url'])
                         details = self.PHOTO_FOLDER_NAME.substitute(name=profile_name, age=profile_age, photos=1)
                         self.load_image_from_url(self.matched_folder, photo_url, details)
             except StaleElementReferenceException:
@@ -701,7 +1140,7 @@ class TinderBot:
     def wait_end_animation(self, xpath):
         logger.info('Waiting for the tutorial animation to finish.')
         try:
-            self.web_driver_wait.until(ec.element_to_be_clickable((By.XPATH, xpath)))
+            self.page_readiness.until_clickable(xpath)
         except TimeoutException:
             logger.info('Search animation in progress, no profiles are shown.')
 
@@ -766,54 +1205,42 @@ class TinderBot:
             else:
                 logger.warning('Something went wrong when recovering the blurry photo.')
 
+    # The Crontab management lives in scheduler.py so it can be used without starting the browser, and it is only imported when the bot
+    # needs it.
     def check_crontab_entry(self):
-        logger.info('Checking Crontab for the next execution.')
+        from scheduler import check_crontab_entry
 
-        script_directory = pathlib.Path(__file__).parent.absolute()
-        script_path = os.path.join(script_directory, 'crontab_script.sh')
-        command_text = 'bash {}'.format(script_path)
-        comment_text = CRONTAB_BOT_COMMENT
-
-        self.remove_crontab_entry(comment_text)
-        self.add_crontab_entry(command_text, comment_text)
+        check_crontab_entry(self.free_limit_reached)
 
     @staticmethod
     def remove_crontab_entry(comment_text=CRONTAB_BOT_COMMENT):
-        user_crontab = CronTab(user=True)
-        job = user_crontab.find_comment(comment_text)
+        from scheduler import remove_crontab_entry
 
-        if job:
-            user_crontab.remove(job)
-            user_crontab.write()
-            logger.info('Previous job entry in Crontab was removed.')
-        else:
-            logger.info('No previous job entry was found in Crontab.')
+        remove_crontab_entry(comment_text)
 
     def add_crontab_entry(self, command_text, comment_text):
-        user_crontab = CronTab(user=True)
-        job = user_crontab.new(command=command_text, comment=comment_text)
-
-        # The bot will wait in 2 different ways:
-        # 1 - If the bot closes because no more profiles are displayed, it will wait 1 hour to let Tinder refresh the profile list.
-        # 2 - If the bot closes because it has reached the free matches limit, it will wait 12 hours and 5 minutes before it starts again.
-        # Tinder has a cooldown time of 12 hours but I give 5 minutes of margin.
-        if self.free_limit_reached:
-            time_pattern = '5 */12 * * *'
-        else:
-            time_pattern = '0 * * * *'
+        from scheduler import add_crontab_entry
 
-        job.setall(time_pattern)
-
-        if job.is_valid():
-            logger.info('Adding new job entry in Crontab.')
-            job.enable()
-            user_crontab.write()
-        else:
-            logger.warning('Invalid Crontab job entry, check the syntax.The bot will not execute automatically.')
+        add_crontab_entry(command_text, comment_text, self.free_limit_reached)
 
     def exit(self):
         logger.info('Closing the bot.')
 
+        self.timer.report()
+        if EARLY_DECISION_MODE != 'off':
+            logger.info('Photos skipped by the early decision: {}.'.format(self.skipped_photos_counter))
+        self.original_photo_executor.shutdown(wait=False)
+        self.http_client.report()
+        self.http_client.close()
+        if self.predictor is not None:
+            self.predictor.report_latency()
+            get_model_registry().report()
+        if self.prediction_cache is not None:
+            self.prediction_cache.report()
+            self.prediction_cache.close()
+        if self.conversation_state is not None:
+            self.conversation_state.report()
+            self.conversation_state.close()
         self.driver.quit()
 
 
@@ -825,6 +1252,6 @@ if __name__ == "__main__":  # Execute only if run as a script
         bot.auto_swipe()
         bot.collect_photos_matched_profiles(skip_animation=True)
         bot.review_messages_from_matching_profiles(skip_animation=True)
-        bot.remove_photo_folder(bot.temporary_folder)
+        bot.close_photo_store()
         bot.check_crontab_entry()
         bot.exit()